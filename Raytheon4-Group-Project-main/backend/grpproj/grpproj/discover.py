@@ -0,0 +1,282 @@
+"""
+Client helpers for the Discover API (authentication and data fetches).
+"""
+
+import asyncio
+import atexit
+import os
+import random
+import threading
+import time
+import weakref
+from urllib.parse import urlsplit
+
+import aiohttp
+import requests
+
+# API Details
+API_BASE_URL = "..."
+USERNAME = "..."
+PASSWORD = "..."
+CLIENT_ID = "..."
+CLIENT_SECRET = "..."
+
+encoded_password = requests.compat.quote_plus(PASSWORD)
+
+# Renew the token this many seconds before the API says it expires, or half
+# way through its lifetime if that is shorter
+TOKEN_REFRESH_MARGIN = int(os.environ.get("TOKEN_REFRESH_MARGIN", 60))
+# Lifetime assumed when the token response has no expires_in
+DEFAULT_TOKEN_LIFETIME = 300
+
+# Most requests allowed in flight to one Discover host at a time
+MAX_IN_FLIGHT = int(os.environ.get("DISCOVER_MAX_IN_FLIGHT", 16))
+# Attempts per request before it is counted as a failure
+MAX_ATTEMPTS = int(os.environ.get("DISCOVER_MAX_ATTEMPTS", 4))
+# Backoff before retry n is a random delay in [0, RETRY_BASE_DELAY * 2**n] seconds
+RETRY_BASE_DELAY = float(os.environ.get("DISCOVER_RETRY_BASE_DELAY", 0.5))
+REQUEST_TIMEOUT = float(os.environ.get("DISCOVER_REQUEST_TIMEOUT", 30))
+# Statuses treated as transient
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Running totals for the async fetch layer, reported after each sync
+fetch_stats = {"requests": 0, "retries": 0, "failures": 0}
+
+def request_token(payload):
+    """Posts a grant to the token endpoint and returns the JSON body, or None on failure."""
+    headers = {
+        "Content-Type": "application/x-www-form-urlencoded",
+        "Accept": "*/*",
+        "Host": "hallam.sci-toolset.com"
+    }
+    try:
+        response = requests.post(
+            f"{API_BASE_URL}/api/v1/token",
+            auth=(CLIENT_ID, CLIENT_SECRET),
+            data=payload,
+            headers=headers,
+            verify=False,
+            # Renewal holds the TokenManager lock, so a hung endpoint must not block forever
+            timeout=REQUEST_TIMEOUT,
+        )
+    except requests.exceptions.RequestException as e:
+        print("⚠️ Token request failed:", e)
+        return None
+    if response.status_code == 200:
+        return response.json()
+    return None
+
+class TokenManager:
+    """Caches the bearer token and renews it shortly before it expires.
+
+    Renewal uses the refresh token when the API issued one and falls back to the
+    password grant. A lock makes it safe to share between gunicorn threads and
+    the ingestion thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._access_token = None
+        self._refresh_token = None
+        self._renew_at = 0
+
+    def _is_fresh(self):
+        return self._access_token is not None and time.time() < self._renew_at
+
+    def get_token(self):
+        with self._lock:
+            if not self._is_fresh():
+                self._renew()
+            return self._access_token
+
+    def cached_token(self):
+        """The cached token if it does not need renewing yet, else None. Never blocks."""
+        token = self._access_token
+        return token if self._is_fresh() else None
+
+    def invalidate(self, token):
+        """Drops the cached token after the API rejected it with a 401.
+
+        Does nothing if the cache already holds a newer token, so requests
+        that were sent with the old one do not discard its replacement.
+        """
+        with self._lock:
+            if self._access_token == token:
+                self._access_token = None
+
+    def _renew(self):
+        token_data = None
+        if self._refresh_token:
+            token_data = request_token(
+                f"grant_type=refresh_token&refresh_token={requests.compat.quote_plus(self._refresh_token)}"
+            )
+        if token_data is None:
+            token_data = request_token(f"grant_type=password&username={USERNAME}&password={encoded_password}")
+
+        if token_data is None:
+            self._access_token = None
+            self._refresh_token = None
+            return
+
+        self._access_token = token_data.get("access_token")
+        self._refresh_token = token_data.get("refresh_token")
+        lifetime = token_data.get("expires_in", DEFAULT_TOKEN_LIFETIME)
+        # A margin as long as the lifetime would renew on every call
+        self._renew_at = time.time() + lifetime - min(TOKEN_REFRESH_MARGIN, lifetime / 2)
+
+token_manager = TokenManager()
+
+# Function to get API token
+def get_access_token():
+    return token_manager.get_token()
+
+def get_headers():
+    headers = {
+        "Authorization": f"Bearer {get_access_token()}",
+        "Content-Type": "application/json",
+        "Accept": "*/*",
+    }
+    return headers
+
+def create_session():
+    """Opens a ClientSession whose connection pool matches the in-flight limit."""
+    connector = aiohttp.TCPConnector(
+        limit=MAX_IN_FLIGHT,
+        limit_per_host=MAX_IN_FLIGHT,
+        ttl_dns_cache=300,
+        ssl=False,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+    )
+
+class BackgroundLoop:
+    """A long-lived event loop in a daemon thread, with one ClientSession shared by every crawl.
+
+    Keeps keep-alive connections, DNS and TLS state across syncs instead of
+    setting them up again each time. The loop is recreated in a forked
+    gunicorn worker, since the parent's thread does not survive the fork.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop = None
+        self._pid = None
+        self._session = None
+
+    def _get_loop(self):
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                self._loop = asyncio.new_event_loop()
+                self._pid = os.getpid()
+                self._session = None
+                threading.Thread(target=self._loop.run_forever, name="discover-loop", daemon=True).start()
+            return self._loop
+
+    def run(self, coroutine):
+        """Runs a coroutine on the loop and blocks until it returns."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._get_loop()).result()
+
+    async def session(self):
+        """The shared session; only called from coroutines running on the loop."""
+        if self._session is None or self._session.closed:
+            self._session = create_session()
+        return self._session
+
+    def close(self):
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid() or self._session is None:
+                return
+            session = self._session
+            self._session = None
+        asyncio.run_coroutine_threadsafe(session.close(), self._loop).result(timeout=5)
+
+background_loop = BackgroundLoop()
+atexit.register(background_loop.close)
+
+# Semaphores belong to one event loop, so they are kept per loop and host
+_host_semaphores = weakref.WeakKeyDictionary()
+
+def host_semaphore(url):
+    semaphores = _host_semaphores.setdefault(asyncio.get_running_loop(), {})
+    host = urlsplit(url).netloc
+    if host not in semaphores:
+        semaphores[host] = asyncio.Semaphore(MAX_IN_FLIGHT)
+    return semaphores[host]
+
+def retry_delay(attempt, response=None):
+    """Jittered exponential backoff, honouring Retry-After on a 429 up to REQUEST_TIMEOUT.
+
+    A sync holds the refresh lock while it waits, so a long Retry-After is cut
+    short and the request counts as failed sooner instead.
+    """
+    if response is not None and response.status == 429:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), REQUEST_TIMEOUT)
+    return random.uniform(0, RETRY_BASE_DELAY * 2 ** attempt)
+
+async def current_token():
+    """The cached token, renewed off the event loop when it is missing or about to expire."""
+    token = token_manager.cached_token()
+    if token is None:
+        token = await asyncio.to_thread(get_access_token)
+    return token
+
+async def async_fetch(session, url, headers):
+    """Fetches API data asynchronously with bounded concurrency and retries.
+
+    Every attempt sends the token cached at that moment, so a token renewed
+    mid-crawl is picked up by the requests still queued. Returns the decoded
+    JSON, or None once transient errors exhaust MAX_ATTEMPTS or the API
+    answers with a non-retryable status, so one bad request does not abort a
+    whole crawl.
+    """
+    semaphore = host_semaphore(url)
+    renewed = False
+    for attempt in range(MAX_ATTEMPTS):
+        delay = None
+        fetch_stats["requests"] += 1
+        try:
+            async with semaphore:
+                token = await current_token()
+                request_headers = {**headers, "Authorization": f"Bearer {token}"}
+                async with session.get(url, headers=request_headers, ssl=False) as response:
+                    if response.status == 200:
+                        return await response.json()
+                    if response.status == 401 and not renewed:
+                        # Token revoked mid-crawl: renew it (once) and retry straight away
+                        token_manager.invalidate(token)
+                        renewed = True
+                        delay = 0
+                    elif response.status in RETRY_STATUSES:
+                        delay = retry_delay(attempt, response)
+                    else:
+                        print(f"⚠️ {url} returned {response.status}")
+                        break
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"⚠️ {url} failed: {e!r}")
+            delay = retry_delay(attempt)
+
+        if attempt + 1 < MAX_ATTEMPTS:
+            fetch_stats["retries"] += 1
+            await asyncio.sleep(delay)
+
+    fetch_stats["failures"] += 1
+    return None
+
+async def fetch_mission_list_async(session, headers):
+    """Asynchronously fetches the mission list, or None if the request fails."""
+    url = f"{API_BASE_URL}/discover/api/v1/missionfeed/missions"
+    return await async_fetch(session, url, headers)
+
+async def fetch_scenes_from_mission_async(session, mission_id, headers):
+    """Asynchronously fetches scene data for a mission."""
+    url = f"{API_BASE_URL}/discover/api/v1/missionfeed/missions/{mission_id}"
+    return await async_fetch(session, url, headers)
+
+async def fetch_product_metadata_async(session, scene_id, headers):
+    """Asynchronously fetches product metadata for a scene."""
+    url = f"{API_BASE_URL}/discover/api/v1/products/{scene_id}"
+    return await async_fetch(session, url, headers)
@@ -0,0 +1,151 @@
+"""
+Geometry helpers: area calculations for scene footprints and regions, and the
+GB land outline scenes are clipped to.
+"""
+
+import numpy as np
+import shapely
+from geopandas import gpd
+from pyproj import Geod
+from shapely import GeometryType
+
+# Areas are measured on the WGS 84 ellipsoid, so no projection is needed
+WGS84 = Geod(ellps="WGS84")
+
+# Geometry type ids of Polygon and MultiPolygon
+POLYGONAL = (3, 6)
+
+def make_valid(geometries):
+    """Repairs invalid geometries in an array with buffer(0), in place."""
+    invalid = ~shapely.is_valid(geometries)
+    if invalid.any():
+        geometries[invalid] = shapely.buffer(geometries[invalid], 0)
+    return geometries
+
+def ring_buffer(rings):
+    """Packs a list of (lon, lat) rings into one (n, 2) coordinate array and ring offsets.
+
+    Ring i is coords[ring_offsets[i]:ring_offsets[i + 1]], exactly as given.
+    """
+    ring_offsets = np.zeros(len(rings) + 1, dtype=np.int64)
+    ring_offsets[1:] = np.cumsum([len(ring) for ring in rings])
+    coords = np.array([point for ring in rings for point in ring], dtype=float).reshape(-1, 2)
+    return coords, ring_offsets
+
+def close_rings(coords, ring_offsets):
+    """Repeats the first point at the end of every packed ring that does not already end with it."""
+    if len(ring_offsets) < 2:
+        return coords, ring_offsets
+    starts, ends = ring_offsets[:-1], ring_offsets[1:]
+    is_open = (coords[starts] != coords[ends - 1]).any(axis=1)
+    coords = np.insert(coords, ends[is_open], coords[starts[is_open]], axis=0)
+    ring_offsets = ring_offsets + np.concatenate([[0], np.cumsum(is_open)])
+    return coords, ring_offsets
+
+def ring_polygons(coords, ring_offsets):
+    """Builds an array of valid single-ring polygons from packed rings in one call."""
+    coords, ring_offsets = close_rings(coords, ring_offsets)
+    polygons = shapely.from_ragged_array(
+        GeometryType.POLYGON, coords, (ring_offsets, np.arange(len(ring_offsets)))
+    )
+    return make_valid(polygons)
+
+def footprint_polygons(footprints):
+    """Builds an array of valid polygons from a list of (lon, lat) rings in one call."""
+    return ring_polygons(*ring_buffer(footprints))
+
+def calculate_areas(geometries):
+    """Returns the geodesic areas in km² of an array of lon/lat (Multi)Polygons.
+
+    Every ring is measured directly on the WGS 84 ellipsoid and hole areas are
+    subtracted from their polygon, so results do not depend on a UTM zone and
+    there is no CRS setup per call. Used for scene footprints and regions alike.
+    """
+    geometries = np.asarray(geometries, dtype=object)
+    areas = np.zeros(len(geometries))
+    if not len(geometries):
+        return areas
+
+    # Flatten MultiPolygons into polygons, then polygons into rings; the first
+    # ring of each polygon is its exterior and the rest are holes
+    parts, part_owner = shapely.get_parts(geometries, return_index=True)
+    rings, ring_part = shapely.get_rings(parts, return_index=True)
+    is_exterior = np.ones(len(rings), dtype=bool)
+    is_exterior[1:] = ring_part[1:] != ring_part[:-1]
+
+    coords, ring_index = shapely.get_coordinates(rings, return_index=True)
+    ring_starts = np.searchsorted(ring_index, np.arange(len(rings) + 1))
+
+    ring_areas = np.empty(len(rings))
+    for i in range(len(rings)):
+        ring = coords[ring_starts[i]:ring_starts[i + 1]]
+        area, _ = WGS84.polygon_area_perimeter(ring[:, 0], ring[:, 1])
+        ring_areas[i] = abs(area)
+
+    signed = np.where(is_exterior, ring_areas, -ring_areas)
+    np.add.at(areas, part_owner[ring_part], signed)
+    return areas / 1_000_000
+
+def polygonal(geometries):
+    """Keeps only the polygon parts of each geometry, in place.
+
+    Intersections can leave lines or points where shapes share an edge; those
+    become empty geometries.
+    """
+    type_ids = shapely.get_type_id(geometries)
+    for i in np.flatnonzero(~np.isin(type_ids, POLYGONAL)):
+        parts = shapely.get_parts(geometries[i])
+        geometries[i] = shapely.union_all(parts[np.isin(shapely.get_type_id(parts), POLYGONAL)])
+    return geometries
+
+class Land:
+    """The GB land outline, loaded once per worker and prepared for repeated clipping.
+
+    All land features are unioned into one geometry, optionally simplified by
+    tolerance (in degrees), and prepared so intersects tests are fast. The
+    polygon parts are also kept in an STRtree.
+    """
+
+    def __init__(self, path, tolerance=0):
+        land = gpd.read_file(path).to_crs("EPSG:4326")
+        geometry = shapely.union_all(land.geometry.values)
+        if tolerance:
+            geometry = shapely.simplify(geometry, tolerance, preserve_topology=True)
+
+        self.geometry = geometry
+        self.parts = shapely.get_parts(geometry)
+        self.tree = shapely.STRtree(self.parts)
+        shapely.prepare(self.geometry)
+        shapely.prepare(self.parts)
+
+    def clip(self, geometries):
+        """Intersects geometries with the land.
+
+        Returns the indices of the geometries that overlap land, and their
+        clipped shapes. The STRtree narrows each geometry down to the land parts
+        it touches: geometries entirely offshore are dropped, geometries lying
+        strictly inside one part are returned as-is, and only those crossing the
+        coastline go through an exact intersection.
+        """
+        geometries = np.asarray(geometries, dtype=object)
+        scene_index, part_index = self.tree.query(geometries, predicate="intersects")
+
+        inside = shapely.contains_properly(self.parts[part_index], geometries[scene_index])
+        inland = np.unique(scene_index[inside])
+        crossing = ~np.isin(scene_index, inland)
+
+        scene_index = scene_index[crossing]
+        pieces = shapely.intersection(geometries[scene_index], self.parts[part_index[crossing]])
+
+        # A scene may cross several land parts (e.g. an estuary); merge its pieces
+        coastal, first, counts = np.unique(scene_index, return_index=True, return_counts=True)
+        clipped = pieces[first]
+        for i in np.flatnonzero(counts > 1):
+            clipped[i] = shapely.union_all(pieces[scene_index == coastal[i]])
+        clipped = polygonal(clipped)
+
+        keep = np.concatenate([inland, coastal])
+        shapes = np.concatenate([geometries[inland], clipped])
+        on_land = ~shapely.is_empty(shapes)
+        order = np.argsort(keep[on_land], kind="stable")
+        return keep[on_land][order], shapes[on_land][order]
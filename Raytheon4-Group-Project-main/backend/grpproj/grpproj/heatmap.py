@@ -0,0 +1,96 @@
+"""
+Scene coverage binned onto lon/lat grids for the heatmap.
+"""
+
+import os
+
+import numpy as np
+import shapely
+
+# Grids are built for these map zoom levels; other zooms use the nearest one
+HEATMAP_MIN_ZOOM = int(os.environ.get("HEATMAP_MIN_ZOOM", 4))
+HEATMAP_MAX_ZOOM = int(os.environ.get("HEATMAP_MAX_ZOOM", 11))
+# Width of a grid cell in screen pixels at its zoom level
+HEATMAP_CELL_PIXELS = 16
+# Leaflet's default zoom level for the heatmap when the client does not send one
+HEATMAP_DEFAULT_ZOOM = 6
+
+def cell_size(zoom):
+    """Cell width in degrees at a map zoom level (256 px tiles)."""
+    return 360 / (256 * 2 ** zoom) * HEATMAP_CELL_PIXELS
+
+def grid_zoom(zoom):
+    """The zoom level of the grid used for a map zoom level."""
+    return min(max(zoom, HEATMAP_MIN_ZOOM), HEATMAP_MAX_ZOOM)
+
+class HeatmapGrids:
+    """Per-zoom grids counting the scene footprints covering each cell.
+
+    A footprint covers a cell when it contains the cell centre. Footprints
+    smaller than a cell still count once, in the cell holding a point on their
+    surface. Only non-empty cells are kept, as parallel arrays sorted by cell.
+    """
+
+    def __init__(self, footprints):
+        footprints = np.asarray(footprints, dtype=object)
+        footprints = footprints[~shapely.is_empty(footprints)]
+        shapely.prepare(footprints)
+        self.levels = {
+            zoom: self._rasterize(footprints, cell_size(zoom))
+            for zoom in range(HEATMAP_MIN_ZOOM, HEATMAP_MAX_ZOOM + 1)
+        }
+
+    @staticmethod
+    def _rasterize(footprints, size):
+        # Cells are numbered from (-180, -90) so a cell keeps its index across rebuilds
+        bounds = shapely.bounds(footprints)
+        first = np.floor((bounds[:, :2] + (180, 90)) / size).astype(np.int64)
+        last = np.floor((bounds[:, 2:] + (180, 90)) / size).astype(np.int64)
+        surface_cells = np.floor(
+            (shapely.get_coordinates(shapely.point_on_surface(footprints)) + (180, 90)) / size
+        ).astype(np.int64)
+
+        covered = []
+        for footprint, (col0, row0), (col1, row1), surface_cell in zip(footprints, first, last, surface_cells):
+            cols, rows = np.meshgrid(np.arange(col0, col1 + 1), np.arange(row0, row1 + 1))
+            cols, rows = cols.ravel(), rows.ravel()
+            inside = shapely.contains_xy(footprint, (cols + 0.5) * size - 180, (rows + 0.5) * size - 90)
+            if inside.any():
+                covered.append(np.column_stack([cols[inside], rows[inside]]))
+            else:
+                covered.append(surface_cell[None, :])
+
+        if not covered:
+            return {"lon": np.empty(0), "lat": np.empty(0), "count": np.empty(0, dtype=np.int64)}
+
+        cells, counts = np.unique(np.concatenate(covered), axis=0, return_counts=True)
+        return {
+            "lon": (cells[:, 0] + 0.5) * size - 180,
+            "lat": (cells[:, 1] + 0.5) * size - 90,
+            "count": counts,
+        }
+
+    def query(self, zoom=HEATMAP_DEFAULT_ZOOM, bbox=None):
+        """Cells of the grid nearest to zoom, limited to bbox (min_lon, min_lat, max_lon, max_lat).
+
+        Returns the zoom level used, the cell size in degrees, the highest count
+        on that grid (so colours stay stable while panning) and the cells as
+        [lat, lon, count] rows.
+        """
+        zoom = grid_zoom(zoom)
+        level = self.levels[zoom]
+        lon, lat, count = level["lon"], level["lat"], level["count"]
+
+        if bbox is not None:
+            min_lon, min_lat, max_lon, max_lat = bbox
+            in_bbox = (lon >= min_lon) & (lon <= max_lon) & (lat >= min_lat) & (lat <= max_lat)
+            lon, lat, count = lon[in_bbox], lat[in_bbox], count[in_bbox]
+
+        return {
+            "zoom": zoom,
+            "cell_size": cell_size(zoom),
+            "max_count": int(level["count"].max()) if len(level["count"]) else 0,
+            "heatmap_data": [
+                list(cell) for cell in zip(lat.round(6).tolist(), lon.round(6).tolist(), count.tolist())
+            ],
+        }
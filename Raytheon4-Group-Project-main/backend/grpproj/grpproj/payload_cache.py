@@ -0,0 +1,82 @@
+"""
+Cache for response bodies derived from the scene store.
+
+A payload is built at most once per store generation, kept in memory and in
+the shared Flask-Caching backend (so other workers, and a restarted worker
+that loads the same generation, skip the rebuild), and served with an ETag so
+unchanged responses can be answered with a 304. Entries are keyed on the
+generation's random token rather than its number, which can repeat.
+"""
+
+import hashlib
+import threading
+
+class PayloadCache:
+    """Serialized payloads for the current store generation.
+
+    build(store, *variant) must return the response body as bytes; variant
+    arguments (e.g. a year or zoom level) each get their own entry.
+    """
+
+    def __init__(self, name, build, shared):
+        self.name = name
+        self.build = build
+        self.shared = shared
+        self._lock = threading.Lock()
+        self._token = None
+        # variant -> (body, etag) for the generation with self._token
+        self._entries = {}
+        # variant -> (entries dict, Event) of builds in progress
+        self._building = {}
+
+    def get(self, store, *variant):
+        """Returns (body, etag), rebuilding the body only if the generation moved on.
+
+        The lock only covers lookups, so a slow build does not hold up other
+        variants; callers asking for a variant already being built wait for
+        that build, as in SceneStore.derived.
+        """
+        while True:
+            with self._lock:
+                if self._token != store.token:
+                    self._token = store.token
+                    self._entries = {}
+                entries, token = self._entries, self._token
+                if variant in entries:
+                    return entries[variant]
+                pending = self._building.get(variant)
+                if pending is None or pending[0] is not entries:
+                    done = threading.Event()
+                    self._building[variant] = (entries, done)
+                    break
+            pending[1].wait()
+
+        try:
+            key = ":".join(str(part) for part in (self.name, token, *variant))
+            body = self._shared_get(key)
+            if body is None:
+                body = self.build(store, *variant)
+                self._shared_set(key, body)
+            entry = (body, hashlib.sha1(body).hexdigest())
+            with self._lock:
+                entries[variant] = entry
+            return entry
+        finally:
+            with self._lock:
+                if self._building.get(variant, (None, None))[1] is done:
+                    del self._building[variant]
+            done.set()
+
+    # An unreachable backend (e.g. Redis being restarted) only costs a rebuild
+    def _shared_get(self, key):
+        try:
+            return self.shared.get(key)
+        except Exception as e:
+            print(f"⚠️ Could not read {key} from the shared cache: {e}")
+            return None
+
+    def _shared_set(self, key, body):
+        try:
+            self.shared.set(key, body)
+        except Exception as e:
+            print(f"⚠️ Could not write {key} to the shared cache: {e}")
@@ -0,0 +1,126 @@
+"""
+County and unitary authority boundaries, used to assign scenes to regions and
+to measure how much of each region the scenes cover.
+"""
+
+import hashlib
+import os
+
+import numpy as np
+import shapely
+from geopandas import gpd
+
+from grpproj.geometry import calculate_areas, make_valid, polygonal
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+COUNTIES_PATH = os.environ.get(
+    "COUNTIES_PATH", os.path.join(project_root, "frontend", "public", "assets", "uk-counties.geojson")
+)
+# Property holding the region name, as used by the frontend's region layer
+COUNTY_NAME_FIELD = os.environ.get("COUNTY_NAME_FIELD", "ctyua_name")
+
+def region_name(value):
+    """A region's name property as a plain string.
+
+    Some boundary files hold names as lists, which are joined with "-" like
+    Transform GEOJSON/geojson.py does for the frontend's region keys.
+
+    >>> region_name(["Rotherham"])
+    'Rotherham'
+    >>> region_name(["Bath", "North East Somerset"])
+    'Bath-North East Somerset'
+    >>> region_name("Rotherham")
+    'Rotherham'
+    """
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return "-".join(str(part) for part in value)
+    return str(value)
+
+class Counties:
+    """Region polygons and names, with an STRtree for spatial joins."""
+
+    def __init__(self, path, name_field=COUNTY_NAME_FIELD):
+        with open(path, "rb") as file:
+            # Identifies these boundaries, so regions assigned with others can be recognised
+            self.digest = f"{hashlib.sha256(file.read()).hexdigest()}:{name_field}"
+        counties = gpd.read_file(path).to_crs("EPSG:4326")
+        counties = counties[counties[name_field].notna() & counties.geometry.notna()]
+
+        self.names = counties[name_field].map(region_name).to_numpy()
+        self.geometries = make_valid(np.asarray(counties.geometry.values, dtype=object))
+        self.areas = calculate_areas(self.geometries)
+        self.tree = shapely.STRtree(self.geometries)
+        shapely.prepare(self.geometries)
+
+    def assign(self, points):
+        """Name of the region containing each point, or None for points outside every region.
+
+        A point on a shared boundary goes to the first region listed in the file.
+        """
+        points = np.asarray(points, dtype=object)
+        names = np.full(len(points), None, dtype=object)
+        if not len(points):
+            return names
+
+        point_index, region_index = self.tree.query(points, predicate="intersects")
+        order = np.lexsort((region_index, point_index))
+        point_index, region_index = point_index[order], region_index[order]
+        matched, first = np.unique(point_index, return_index=True)
+        names[matched] = self.names[region_index[first]]
+        return names
+
+    def coverage(self, index, year=None):
+        """Coverage of every region by the scenes in a SceneIndex, optionally for one year.
+
+        The footprints overlapping a region are unioned before being intersected
+        with it, so overlapping scenes are not counted twice and a scene
+        crossing a border credits every region it covers. Areas are geodesic
+        km²; coverage is the covered share of the region as a percentage.
+        """
+        footprints = index.tree.geometries
+        positions = np.arange(len(footprints))
+        if year is not None:
+            # Scenes are dated like index.query does: objectstartdate, else takeoff
+            years = index.times.astype("datetime64[Y]").astype(np.int64) + 1970
+            positions = positions[~np.isnat(index.times) & (years == year)]
+
+        scene_index, region_index = self.tree.query(footprints[positions], predicate="intersects")
+        scene_index = positions[scene_index]
+        # Scenes that only share a border with a region add no area and are not counted
+        overlapping = ~shapely.touches(footprints[scene_index], self.geometries[region_index])
+        scene_index, region_index = scene_index[overlapping], region_index[overlapping]
+        order = np.argsort(region_index, kind="stable")
+        scene_index, region_index = scene_index[order], region_index[order]
+        regions, starts = np.unique(region_index, return_index=True)
+        groups = np.split(scene_index, starts[1:]) if len(regions) else []
+
+        unions = np.array([shapely.union_all(footprints[group]) for group in groups], dtype=object)
+        covered = polygonal(shapely.intersection(unions, self.geometries[regions]))
+        covered_areas = np.zeros(len(self.geometries))
+        covered_areas[regions] = calculate_areas(covered)
+
+        scene_counts = np.zeros(len(self.geometries), dtype=np.int64)
+        mission_counts = np.zeros(len(self.geometries), dtype=np.int64)
+        for region, group in zip(regions, groups):
+            scene_counts[region] = len(group)
+            mission_counts[region] = len(np.unique(index.mission_ids[group]))
+
+        return {
+            name: {
+                "area": float(area),
+                "covered_area": float(covered_area),
+                "coverage": float(100 * covered_area / area) if area else 0.0,
+                "scenes": int(scene_count),
+                "missions": int(mission_count),
+            }
+            for name, area, covered_area, scene_count, mission_count in zip(
+                self.names, self.areas, covered_areas, scene_counts, mission_counts
+            )
+        }
+
+# Load the boundaries once per process; without them scenes are left unassigned
+try:
+    counties = Counties(COUNTIES_PATH)
+except Exception as e:
+    print(f"⚠️ Could not load region boundaries from {COUNTIES_PATH}: {e}")
+    counties = None
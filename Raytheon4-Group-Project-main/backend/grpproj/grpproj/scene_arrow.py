@@ -0,0 +1,64 @@
+"""
+Scenes as an Apache Arrow table, for clients that would rather copy typed
+arrays than parse nested JSON.
+
+Attributes are plain columns (timestamps as UTC milliseconds, repeated names
+dictionary-encoded) and footprints are a GeoArrow polygon column: one
+interleaved lon/lat buffer with ring and polygon offsets. GeoPandas, DuckDB
+and apache-arrow in the browser read it without a custom decoder.
+"""
+
+import json
+
+import numpy as np
+import pyarrow as pa
+
+from grpproj.geometry import close_rings
+
+ARROW_MIMETYPE = "application/vnd.apache.arrow.stream"
+
+# Footprint column type and extension metadata, per the GeoArrow 0.1 spec
+POLYGON_TYPE = pa.list_(pa.field("rings", pa.list_(pa.field("vertices", pa.list_(pa.field("xy", pa.float64()), 2)))))
+POLYGON_METADATA = {
+    "ARROW:extension:name": "geoarrow.polygon",
+    "ARROW:extension:metadata": json.dumps({"crs": "OGC:CRS84", "crs_type": "authority_code"}),
+}
+
+def timestamps(times):
+    """UTC millisecond timestamps, with NaT as null."""
+    return pa.array(times, type=pa.timestamp("ms", tz="UTC"), from_pandas=True)
+
+def footprints(coords, ring_offsets):
+    """GeoArrow polygons, each with the one exterior ring scenes have."""
+    coords, ring_offsets = close_rings(coords, ring_offsets)
+    vertices = pa.FixedSizeListArray.from_arrays(pa.array(coords.ravel()), type=POLYGON_TYPE.value_type.value_type)
+    ring_array = pa.ListArray.from_arrays(pa.array(ring_offsets, type=pa.int32()), vertices, type=POLYGON_TYPE.value_type)
+    polygon_offsets = pa.array(np.arange(len(ring_offsets), dtype=np.int32))
+    return pa.ListArray.from_arrays(polygon_offsets, ring_array, type=POLYGON_TYPE)
+
+def scene_table(scenes):
+    """Arrow table with one row per scene of a SceneColumns, copied column by column."""
+    columns = {
+        "scene_id": pa.array(scenes.scene_ids, type=pa.string()),
+        "mission_id": pa.DictionaryArray.from_arrays(
+            pa.array(scenes.missions), pa.array(scenes.mission_ids, type=pa.string())
+        ),
+        "mission_name": pa.array(scenes.mission_names, type=pa.string()).dictionary_encode(),
+        "aircraft_takeoff_time": timestamps(scenes.takeoff_times),
+        "objectstartdate": timestamps(scenes.start_times),
+        "area": pa.array(scenes.areas, from_pandas=True),
+        "region": pa.array(scenes.regions, type=pa.string()).dictionary_encode(),
+        "centre_lon": pa.array(scenes.centres[:, 0], from_pandas=True),
+        "centre_lat": pa.array(scenes.centres[:, 1], from_pandas=True),
+    }
+    fields = [pa.field(name, array.type) for name, array in columns.items()]
+    fields.append(pa.field("footprint", POLYGON_TYPE, metadata=POLYGON_METADATA))
+    arrays = [*columns.values(), footprints(scenes.coords, scenes.ring_offsets)]
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+def to_stream(table):
+    """Serializes a table in the Arrow IPC stream format."""
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
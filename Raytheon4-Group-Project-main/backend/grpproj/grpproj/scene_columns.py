@@ -0,0 +1,254 @@
+"""
+Column-oriented snapshot of the missions and scenes held by the scene store.
+
+Scenes are parallel NumPy arrays in store order (missions in API order, each
+mission's scenes in its own order) and reference a separate mission table by
+index. Footprints share one coordinate buffer with ring offsets instead of a
+list of lists per scene, so a snapshot costs a few dozen bytes per scene plus
+its ids, and every projection served to clients is a slice of these arrays.
+"""
+
+import numpy as np
+
+from grpproj.geometry import ring_buffer, ring_polygons
+
+def shared_strings(values):
+    """Object array of values that keeps one str object per distinct value."""
+    shared = {}
+    return np.array([shared.setdefault(value, value) for value in values], dtype=object)
+
+def to_times(values):
+    """Millisecond datetimes from ISO strings, with None as NaT."""
+    return np.array([value or "NaT" for value in values], dtype="datetime64[ms]")
+
+def to_iso(times):
+    """ISO strings in the form epoch_ms_to_iso writes them, with NaT as None."""
+    return [None if time is None else time.isoformat() for time in times.astype(object)]
+
+def same_values(a, b):
+    """Elementwise equality that also treats two missing values (NaN or NaT) as equal."""
+    missing = np.isnat if a.dtype.kind == "M" else np.isnan
+    return (a == b) | (missing(a) & missing(b))
+
+def to_nullable(values):
+    """Python floats (or lists of them for 2D arrays) with NaN as None."""
+    missing = np.isnan(values) if values.ndim == 1 else np.isnan(values).any(axis=1)
+    values = values.tolist()
+    for position in np.flatnonzero(missing):
+        values[position] = None
+    return values
+
+class SceneColumns:
+    """Mission table plus one row per scene.
+
+    Missions: mission_ids and mission_takeoff_times. Scenes: scene_ids,
+    missions (row in the mission table), mission_names, areas (km²), centres
+    ((n, 2) lon/lat), takeoff_times, start_times and regions. Footprint ring i
+    is coords[ring_offsets[i]:ring_offsets[i + 1]]. Missing values are None,
+    NaN or NaT. Rows are grouped by mission, in mission table order.
+    """
+
+    def __init__(self, mission_ids, mission_takeoff_times, scene_ids, missions, mission_names,
+                 coords, ring_offsets, areas, centres, takeoff_times, start_times, regions):
+        self.mission_ids = mission_ids
+        self.mission_takeoff_times = mission_takeoff_times
+        self.scene_ids = scene_ids
+        self.missions = missions
+        self.mission_names = mission_names
+        self.coords = coords
+        self.ring_offsets = ring_offsets
+        self.areas = areas
+        self.centres = centres
+        self.takeoff_times = takeoff_times
+        self.start_times = start_times
+        self.regions = regions
+
+    @classmethod
+    def from_records(cls, missions, scenes):
+        """Packs (mission_id, aircraftTakeOffTime) pairs and scene dicts as built by parse_scene.
+
+        Scenes must already be grouped by mission in the order of missions.
+        """
+        mission_positions = {mission_id: position for position, (mission_id, _) in enumerate(missions)}
+        coords, ring_offsets = ring_buffer([scene["coordinates"] for scene in scenes])
+        return cls(
+            mission_ids=shared_strings(mission_id for mission_id, _ in missions),
+            mission_takeoff_times=to_times(takeoff for _, takeoff in missions),
+            scene_ids=np.array([scene["scene_id"] for scene in scenes], dtype=object),
+            missions=np.array([mission_positions[scene["mission_id"]] for scene in scenes], dtype=np.int32),
+            mission_names=shared_strings(scene["mission_name"] for scene in scenes),
+            coords=coords,
+            ring_offsets=ring_offsets,
+            areas=np.array([np.nan if scene["area"] is None else scene["area"] for scene in scenes], dtype=float),
+            centres=np.array(
+                [scene["centre_point"] or (np.nan, np.nan) for scene in scenes], dtype=float
+            ).reshape(-1, 2),
+            takeoff_times=to_times(scene["aircraftTakeOffTime"] for scene in scenes),
+            start_times=to_times(scene["objectstartdate"] for scene in scenes),
+            regions=shared_strings(scene["region"] for scene in scenes),
+        )
+
+    @classmethod
+    def empty(cls):
+        return cls.from_records([], [])
+
+    def __len__(self):
+        return len(self.scene_ids)
+
+    def take(self, positions):
+        """The scenes at positions, in that order, with the same mission table."""
+        positions = np.asarray(positions, dtype=np.int64)
+        starts = self.ring_offsets[positions]
+        lengths = self.ring_offsets[positions + 1] - starts
+        ring_offsets = np.zeros(len(positions) + 1, dtype=np.int64)
+        ring_offsets[1:] = np.cumsum(lengths)
+        coords = self.coords[np.repeat(starts - ring_offsets[:-1], lengths) + np.arange(ring_offsets[-1])]
+        return SceneColumns(
+            self.mission_ids, self.mission_takeoff_times, self.scene_ids[positions], self.missions[positions],
+            self.mission_names[positions], coords, ring_offsets, self.areas[positions], self.centres[positions],
+            self.takeoff_times[positions], self.start_times[positions], self.regions[positions],
+        )
+
+    def append(self, other):
+        """These scenes followed by other's, which must index the same mission table."""
+        return SceneColumns(
+            self.mission_ids, self.mission_takeoff_times,
+            np.concatenate([self.scene_ids, other.scene_ids]),
+            np.concatenate([self.missions, other.missions]),
+            np.concatenate([self.mission_names, other.mission_names]),
+            np.concatenate([self.coords, other.coords]),
+            np.concatenate([self.ring_offsets, other.ring_offsets[1:] + self.ring_offsets[-1]]),
+            np.concatenate([self.areas, other.areas]),
+            np.concatenate([self.centres, other.centres]),
+            np.concatenate([self.takeoff_times, other.takeoff_times]),
+            np.concatenate([self.start_times, other.start_times]),
+            np.concatenate([self.regions, other.regions]),
+        )
+
+    def with_missions(self, mission_ids, mission_takeoff_times, missions):
+        """The same scenes pointing into another mission table."""
+        return SceneColumns(
+            mission_ids, mission_takeoff_times, self.scene_ids, np.asarray(missions, dtype=np.int32),
+            self.mission_names, self.coords, self.ring_offsets, self.areas, self.centres,
+            self.takeoff_times, self.start_times, self.regions,
+        )
+
+    def mission_starts(self):
+        """Row where each mission's scenes start, plus the row count at the end."""
+        return np.searchsorted(self.missions, np.arange(len(self.mission_ids) + 1))
+
+    def mission_positions(self):
+        """Each scene's position within its mission."""
+        return np.arange(len(self)) - self.mission_starts()[self.missions]
+
+    def changed_rows(self, previous):
+        """Rows that are new since previous or differ from the same scene there,
+        and the ids of previous's scenes that are gone."""
+        previous_rows = dict(zip(previous.scene_ids.tolist(), range(len(previous))))
+        matches = np.array([previous_rows.pop(scene_id, -1) for scene_id in self.scene_ids.tolist()], dtype=np.int64)
+        changed = matches < 0
+
+        rows = np.flatnonzero(~changed)
+        old = matches[rows]
+        differs = (
+            (self.mission_ids[self.missions[rows]] != previous.mission_ids[previous.missions[old]])
+            | (self.mission_positions()[rows] != previous.mission_positions()[old])
+            | (self.mission_names[rows] != previous.mission_names[old])
+            | (self.regions[rows] != previous.regions[old])
+            | ~same_values(self.areas[rows], previous.areas[old])
+            | ~same_values(self.centres[rows], previous.centres[old]).all(axis=1)
+            | ~same_values(self.takeoff_times[rows], previous.takeoff_times[old])
+            | ~same_values(self.start_times[rows], previous.start_times[old])
+        )
+        # Footprints of the same length are compared point by point
+        same_length = np.diff(self.ring_offsets)[rows] == np.diff(previous.ring_offsets)[old]
+        differs |= ~same_length
+        compared = np.flatnonzero(same_length & ~differs)
+        if len(compared):
+            current, before = self.take(rows[compared]), previous.take(old[compared])
+            moved = (current.coords != before.coords).any(axis=1)
+            differs[compared] = np.logical_or.reduceat(moved, current.ring_offsets[:-1])
+        changed[rows] = differs
+        return np.flatnonzero(changed), list(previous_rows)
+
+    def rings(self):
+        """Footprints as lists of [lon, lat] lists, the shape the API returned them in."""
+        coords = self.coords.tolist()
+        offsets = self.ring_offsets.tolist()
+        return [coords[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+
+    def footprints(self):
+        """Valid shapely polygons of the footprints."""
+        return ring_polygons(self.coords, self.ring_offsets)
+
+    def bounds(self):
+        """(min_lon, min_lat, max_lon, max_lat) of every footprint, as an (n, 4) array."""
+        if not len(self):
+            return np.empty((0, 4))
+        starts = self.ring_offsets[:-1]
+        return np.column_stack([
+            np.minimum.reduceat(self.coords, starts), np.maximum.reduceat(self.coords, starts),
+        ])
+
+    def times(self):
+        """When each scene was taken: its objectstartdate, else its mission's takeoff time."""
+        return np.where(np.isnat(self.start_times), self.takeoff_times, self.start_times)
+
+    def coverage_items(self):
+        """(mission_id, entry) pairs of the mission -> scene dictionary served by /coverage,
+        built one mission at a time."""
+        starts = self.mission_starts()
+        mission_takeoffs = to_iso(self.mission_takeoff_times)
+        for mission, mission_id in enumerate(self.mission_ids.tolist()):
+            scenes = self.take(np.arange(starts[mission], starts[mission + 1]))
+            entry = {"aircraftTakeOffTime": mission_takeoffs[mission]}
+            for scene_id, ring, area, mission_name, centre, takeoff, start, region in zip(
+                scenes.scene_ids.tolist(), scenes.rings(), to_nullable(scenes.areas), scenes.mission_names.tolist(),
+                to_nullable(scenes.centres), to_iso(scenes.takeoff_times), to_iso(scenes.start_times),
+                scenes.regions.tolist(),
+            ):
+                entry[scene_id] = {
+                    "coordinates": ring,
+                    "area": area,
+                    "mission_name": mission_name,
+                    "centre_point": centre,
+                    "scene_id": scene_id,
+                    "aircraftTakeOffTime": takeoff,
+                    "objectstartdate": start,
+                    "region": region,
+                }
+            yield mission_id, entry
+
+    def bboxes(self):
+        """Scene footprints with their mission name, as served by /scenes."""
+        return [
+            {"scene_id": scene_id, "mission_name": mission_name, "coordinates": ring}
+            for scene_id, mission_name, ring in zip(self.scene_ids.tolist(), self.mission_names.tolist(), self.rings())
+        ]
+
+    def features(self):
+        """Scene attributes and shapely footprints as columns, ready to load into a GeoDataFrame."""
+        return {
+            "scene_id": self.scene_ids,
+            "mission_name": self.mission_names,
+            "objectstartdate": to_iso(self.start_times),
+            "aircrafttakeofftime": to_iso(self.takeoff_times),
+            "geometry": self.footprints(),
+        }
+
+    def region_histogram(self):
+        """Distinct missions per takeoff year of every region its scenes fall in, as {region: {year: count}}."""
+        years = self.mission_takeoff_times.astype("datetime64[Y]").astype(np.int64) + 1970
+        rows = np.not_equal(self.regions, None) & ~np.isnat(self.mission_takeoff_times)[self.missions]
+        if not rows.any():
+            return {}
+
+        names, region_codes = np.unique(self.regions[rows].astype(str), return_inverse=True)
+        missions = self.missions[rows]
+        region_missions = np.unique(np.column_stack([region_codes, years[missions], missions]), axis=0)
+        region_years, counts = np.unique(region_missions[:, :2], axis=0, return_counts=True)
+
+        histogram = {}
+        for (region, year), count in zip(region_years.tolist(), counts.tolist()):
+            histogram.setdefault(str(names[region]), {})[year] = count
+        return histogram
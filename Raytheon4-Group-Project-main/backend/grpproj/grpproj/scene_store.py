@@ -0,0 +1,845 @@
+"""
+Canonical in-process store of the missions and scenes ingested from the Discover API.
+
+Scenes are held column-wise (see scene_columns) and the store is refreshed in
+the background once per refresh interval; every route
+projects its own view (coverage dictionary, heatmap grids, scene bounding
+boxes, clip features) from it instead of crawling the API itself.
+"""
+
+import asyncio
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:
+    # Windows development server: one process, so no refresh election
+    fcntl = None
+
+import numpy as np
+import shapely
+
+from grpproj.discover import (
+    MAX_IN_FLIGHT,
+    background_loop,
+    fetch_stats,
+    get_headers,
+    fetch_mission_list_async,
+    fetch_scenes_from_mission_async,
+    fetch_product_metadata_async,
+)
+from grpproj.geometry import calculate_areas, footprint_polygons
+from grpproj.regions import counties
+from grpproj.scene_columns import SceneColumns, to_iso, to_nullable
+
+# Seconds a sync stays fresh before the next request triggers a new one
+REFRESH_INTERVAL = int(os.environ.get("SCENE_STORE_REFRESH_INTERVAL", 3600))
+# Known missions that took off within this many seconds of the newest one get
+# their scene list re-read on incremental syncs, since they may still gain scenes
+RESCAN_WINDOW = int(os.environ.get("SCENE_STORE_RESCAN_WINDOW", 7 * 86400))
+# Seconds before a failed sync is retried
+RETRY_INTERVAL = int(os.environ.get("SCENE_STORE_RETRY_INTERVAL", 300))
+# Seconds between full re-crawls that also pick up edits to known scenes
+FULL_SYNC_INTERVAL = int(os.environ.get("SCENE_STORE_FULL_SYNC_INTERVAL", 7 * 86400))
+
+DATA_DIR = os.environ.get("GRPPROJ_DATA_DIR", os.path.join(os.path.dirname(__file__), "data"))
+DB_PATH = os.path.join(DATA_DIR, "scene_store.sqlite")
+# Held by the one worker on the host that syncs; the others reload what it saves
+REFRESH_LOCK_PATH = os.path.join(DATA_DIR, "refresh.lock")
+# Seconds between checks for a sync finished by another worker
+FOLLOW_INTERVAL = 1
+
+DB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value);
+CREATE TABLE IF NOT EXISTS missions (
+    mission_id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    aircraft_takeoff_time TEXT
+);
+CREATE TABLE IF NOT EXISTS scenes (
+    id INTEGER PRIMARY KEY,
+    scene_id TEXT NOT NULL UNIQUE,
+    mission_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    mission_name TEXT,
+    coordinates TEXT NOT NULL,
+    area REAL,
+    centre_lon REAL,
+    centre_lat REAL,
+    aircraft_takeoff_time TEXT,
+    objectstartdate TEXT,
+    region TEXT
+);
+-- Spatial, time and mission filters are answered by the in-memory SceneIndex;
+-- the database is only read back whole, in mission order
+CREATE INDEX IF NOT EXISTS scenes_by_mission ON scenes (mission_id, position);
+CREATE TABLE IF NOT EXISTS watermark_missions (mission_id TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS watermark_scenes (scene_id TEXT PRIMARY KEY);
+"""
+
+def connect_db(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path)
+    # WAL lets other workers read while one of them writes a new generation
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(DB_SCHEMA)
+    return conn
+
+def epoch_ms_to_iso(epoch_ms):
+    """Converts an API epoch in milliseconds to an ISO string (None if missing)."""
+    if not isinstance(epoch_ms, (int, float)) or not epoch_ms:
+        return None
+    return datetime.utcfromtimestamp(epoch_ms / 1000).isoformat()
+
+def parse_scene(mission_id, scene_id, scene_data, aircraft_takeoff_time):
+    """Builds a scene record from product metadata, or None if it has no usable footprint."""
+    result = scene_data.get("product", {}).get("result", {})
+    coordinates = result.get("footprint", {}).get("coordinates", [])
+    if not coordinates or len(coordinates[0]) < 3:
+        return None
+
+    # Footprints are single-ring polygons of (lon, lat) points
+    coordinates = coordinates[0]
+
+    centre_point = result.get("centre")
+    if centre_point:
+        lat, lon = map(float, centre_point.split(","))
+        centre_point = (lon, lat)
+    else:
+        centre_point = None
+
+    return {
+        "scene_id": scene_id,
+        "mission_id": mission_id,
+        "mission_name": result.get("imagery", {}).get("missionname", "Unknown"),
+        "coordinates": coordinates,
+        "area": None,  # Filled in for the whole batch by ingest_async
+        "centre_point": centre_point,
+        "aircraftTakeOffTime": aircraft_takeoff_time,
+        "objectstartdate": epoch_ms_to_iso(result.get("objectstartdate")),
+        "region": None,  # Filled in for the whole batch by ingest_async
+    }
+
+def assign_regions(centres, footprints):
+    """Region of each scene from the county containing its centre point, in one spatial join.
+
+    centres is an (n, 2) lon/lat array with NaN for scenes without a centre
+    point; those fall back to a point on their footprint from the matching
+    array of polygons. Returns None for scenes outside every region.
+    """
+    if counties is None or not len(centres):
+        return np.full(len(centres), None, dtype=object)
+    points = shapely.points(centres)
+    missing = np.isnan(centres).any(axis=1)
+    if missing.any():
+        points[missing] = shapely.point_on_surface(footprints[missing])
+    return counties.assign(points)
+
+# Boundaries the store's regions are assigned with; a database saved with others is reassigned on load
+REGIONS_SOURCE = None if counties is None else counties.digest
+
+def empty_watermark():
+    return {"mission_ids": set(), "scene_ids": set(), "last_takeoff": None}
+
+def read_watermark(conn, meta):
+    return {
+        "mission_ids": {row[0] for row in conn.execute("SELECT mission_id FROM watermark_missions")},
+        "scene_ids": {row[0] for row in conn.execute("SELECT scene_id FROM watermark_scenes")},
+        "last_takeoff": meta.get("last_takeoff"),
+    }
+
+class SceneStore:
+    """Missions and scenes from the last successful sync, plus the views derived from them."""
+
+    def __init__(self):
+        # Mission table and per-scene arrays, replaced as a whole on every new generation
+        self.columns = SceneColumns.empty()
+        self.generation = 0
+        # Random id of the generation; the counter restarts with a new database and can
+        # repeat after a failed save, so caches shared across workers are keyed on this
+        self.token = uuid.uuid4().hex
+        self.synced_at = None
+        self.full_synced_at = None
+        # What has already been fetched, so incremental syncs can skip it
+        self.watermark = empty_watermark()
+        # (token, columns, watermark) as last saved to or loaded from the database
+        self._saved = None
+        # Values computed from the current generation, see derived()
+        self._derived = {}
+        # name -> (derived dict, Event) of builds in progress
+        self._building = {}
+        self._lock = threading.RLock()
+
+    def replace(self, columns):
+        """Swaps in a freshly ingested set of missions and scenes and bumps the generation."""
+        with self._lock:
+            self.columns = columns
+            self.generation += 1
+            self.token = uuid.uuid4().hex
+            self.synced_at = time.time()
+            self._derived = {}
+
+    def derived(self, name, build):
+        """Returns build(self), computed once per generation and shared by all requests.
+
+        The build runs outside the store lock, so one slow value does not hold
+        up the others or the next generation. Callers asking for a value that is
+        already being built wait for that build instead of starting their own.
+        """
+        while True:
+            with self._lock:
+                values = self._derived
+                if name in values:
+                    return values[name]
+                pending = self._building.get(name)
+                if pending is None or pending[0] is not values:
+                    done = threading.Event()
+                    self._building[name] = (values, done)
+                    break
+            pending[1].wait()
+
+        try:
+            value = build(self)
+            with self._lock:
+                # Lands in the generation it was started for, even if a newer one replaced it
+                values[name] = value
+            return value
+        finally:
+            with self._lock:
+                if self._building.get(name, (None, None))[1] is done:
+                    del self._building[name]
+            done.set()
+
+    def region_histogram(self, region=None):
+        """Distinct missions per takeoff year for one region, or {region: histogram} for all."""
+        histogram = self.derived("region_histogram", lambda store: store.columns.region_histogram())
+        if region is not None:
+            return histogram.get(region, {})
+        return histogram
+
+    def index(self):
+        """Spatial and temporal index over the current scenes."""
+        return self.derived("index", SceneIndex)
+
+    def merge(self, ingest, full=False):
+        """Folds an ingest result into the store.
+
+        Missions keep the API order and missions no longer listed upstream are
+        dropped. Scenes fetched this time are added to (or, on a full sync,
+        replace) the scenes already held for their mission. Whatever this crawl
+        failed to fetch, a mission's scene list or a scene's metadata, keeps the
+        rows already held, even on a full sync.
+        """
+        if full:
+            self.watermark = empty_watermark()
+
+        held = self.columns
+        held_starts = held.mission_starts()
+        held_positions = {mission_id: position for position, mission_id in enumerate(held.mission_ids.tolist())}
+
+        # Rows of the merged table: positions in held, or len(held) + position in added
+        missions = []
+        rows = []
+        added = []
+        remap = np.full(len(held.mission_ids), -1, dtype=np.int32)
+        for mission_id, aircraft_takeoff_time in ingest["missions"]:
+            existing = held_positions.get(mission_id)
+            listed = mission_id in ingest["scene_order"]
+            if existing is None and not listed:
+                continue
+
+            held_rows = {}
+            if existing is not None:
+                remap[existing] = len(missions)
+                start, end = held_starts[existing], held_starts[existing + 1]
+                held_rows = dict(zip(held.scene_ids[start:end].tolist(), range(start, end)))
+
+            fetched = ingest["scenes"].get(mission_id, {})
+            if full and listed:
+                # The mission's scenes are replaced in API order, except those whose metadata could not be fetched
+                scene_rows = {}
+                for scene_id in ingest["scene_order"][mission_id]:
+                    if scene_id in fetched:
+                        scene_rows[scene_id] = len(held) + len(added)
+                        added.append(fetched[scene_id])
+                    elif scene_id in ingest["failed_scenes"] and scene_id in held_rows:
+                        scene_rows[scene_id] = held_rows[scene_id]
+            else:
+                # Refetched scenes keep their place, new ones go after the mission's other scenes
+                scene_rows = held_rows
+                for scene_id, scene in fetched.items():
+                    scene_rows[scene_id] = len(held) + len(added)
+                    added.append(scene)
+
+            missions.append((mission_id, aircraft_takeoff_time))
+            rows.extend(scene_rows.values())
+
+        # Missions with a failed fetch are scanned again next time, however old they are
+        self.watermark["mission_ids"] |= ingest["scanned_missions"]
+        self.watermark["mission_ids"] -= ingest["failed_missions"]
+        self.watermark["scene_ids"] |= ingest["fetched_scenes"]
+        if ingest["last_takeoff"] is not None:
+            self.watermark["last_takeoff"] = max(self.watermark["last_takeoff"] or 0, ingest["last_takeoff"])
+
+        new_scenes = any(ingest["scenes"].values())
+        if full or new_scenes or [mission_id for mission_id, _ in missions] != held.mission_ids.tolist():
+            added = SceneColumns.from_records(missions, added)
+            held = held.with_missions(added.mission_ids, added.mission_takeoff_times, remap[held.missions])
+            self.replace(held.append(added).take(rows))
+        else:
+            # Nothing changed upstream: keep the generation so derived caches stay valid
+            self.synced_at = time.time()
+        if full:
+            self.full_synced_at = self.synced_at
+
+    def is_stale(self):
+        return self.synced_at is None or time.time() - self.synced_at > REFRESH_INTERVAL
+
+    def needs_full_sync(self):
+        return self.full_synced_at is None or time.time() - self.full_synced_at > FULL_SYNC_INTERVAL
+
+    def save(self, path):
+        """Persists the store to the SQLite database at path.
+
+        Only the missions, scenes and watermark entries added, changed or
+        removed since the last save or load are written, in one transaction;
+        missions and scenes are only compared when the columns were replaced. A
+        database holding some other generation is rewritten instead.
+        """
+        with self._lock:
+            generation, token, columns = self.generation, self.token, self.columns
+            watermark = {key: set(self.watermark[key]) for key in ("mission_ids", "scene_ids")}
+
+        conn = connect_db(path)
+        try:
+            with conn:
+                saved = conn.execute("SELECT value FROM meta WHERE key = 'token'").fetchone()
+                previous = self._saved
+                if saved is None or previous is None or saved[0] != previous[0]:
+                    for table in ("missions", "scenes", "watermark_missions", "watermark_scenes"):
+                        conn.execute(f"DELETE FROM {table}")
+                    previous = (None, SceneColumns.empty(), empty_watermark())
+                if previous[1] is not columns:
+                    self._write_scenes(conn, columns, previous[1])
+                # Syncs that keep the generation can still move the watermark
+                self._write_watermark(conn, watermark, previous[2])
+                conn.executemany(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                    [
+                        ("generation", generation),
+                        ("token", token),
+                        ("synced_at", self.synced_at),
+                        ("full_synced_at", self.full_synced_at),
+                        ("last_takeoff", self.watermark["last_takeoff"]),
+                        ("regions_source", REGIONS_SOURCE),
+                    ],
+                )
+            self._saved = (token, columns, watermark)
+        finally:
+            conn.close()
+
+    def _write_scenes(self, conn, columns, previous):
+        """Brings the missions and scenes tables from previous up to columns."""
+        previous_missions = {
+            mission_id: (position, aircraft_takeoff_time)
+            for position, (mission_id, aircraft_takeoff_time) in enumerate(
+                zip(previous.mission_ids.tolist(), to_iso(previous.mission_takeoff_times))
+            )
+        }
+        conn.executemany(
+            "INSERT OR REPLACE INTO missions (mission_id, position, aircraft_takeoff_time) VALUES (?, ?, ?)",
+            [
+                (mission_id, position, aircraft_takeoff_time)
+                for position, (mission_id, aircraft_takeoff_time) in enumerate(
+                    zip(columns.mission_ids.tolist(), to_iso(columns.mission_takeoff_times))
+                )
+                if previous_missions.pop(mission_id, None) != (position, aircraft_takeoff_time)
+            ],
+        )
+        conn.executemany("DELETE FROM missions WHERE mission_id = ?", [(mission_id,) for mission_id in previous_missions])
+
+        rows, removed = columns.changed_rows(previous)
+        conn.executemany("DELETE FROM scenes WHERE scene_id = ?", [(scene_id,) for scene_id in removed])
+        positions = columns.mission_positions()[rows]
+        changed = columns.take(rows)
+        centres = changed.centres.astype(object)
+        centres[np.isnan(changed.centres)] = None
+        conn.executemany(
+            "INSERT OR REPLACE INTO scenes (scene_id, mission_id, position, mission_name, coordinates, area, "
+            "centre_lon, centre_lat, aircraft_takeoff_time, objectstartdate, region) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            zip(
+                changed.scene_ids.tolist(), changed.mission_ids[changed.missions].tolist(),
+                positions.tolist(), changed.mission_names.tolist(), map(json.dumps, changed.rings()),
+                to_nullable(changed.areas), centres[:, 0].tolist(), centres[:, 1].tolist(),
+                to_iso(changed.takeoff_times), to_iso(changed.start_times), changed.regions.tolist(),
+            ),
+        )
+
+    def _write_watermark(self, conn, watermark, previous):
+        """Brings the watermark tables from previous up to watermark."""
+        for table, key, column in (
+            ("watermark_missions", "mission_ids", "mission_id"),
+            ("watermark_scenes", "scene_ids", "scene_id"),
+        ):
+            conn.executemany(
+                f"DELETE FROM {table} WHERE {column} = ?",
+                [(value,) for value in previous[key] - watermark[key]],
+            )
+            conn.executemany(
+                f"INSERT INTO {table} VALUES (?)",
+                [(value,) for value in watermark[key] - previous[key]],
+            )
+
+    def load(self, path):
+        """Restores the store from the SQLite database at path. Returns False if there is none."""
+        if not os.path.exists(path):
+            return False
+
+        try:
+            conn = connect_db(path)
+        except sqlite3.Error as e:
+            print("⚠️ Ignoring unreadable scene store database:", e)
+            return False
+
+        try:
+            meta = dict(conn.execute("SELECT key, value FROM meta"))
+            if "token" not in meta:
+                return False
+
+            missions = conn.execute(
+                "SELECT mission_id, aircraft_takeoff_time FROM missions ORDER BY position"
+            ).fetchall()
+            rows = conn.execute(
+                "SELECT scene_id, mission_id, mission_name, coordinates, area, centre_lon, centre_lat, "
+                "scenes.aircraft_takeoff_time, objectstartdate, region FROM scenes "
+                "JOIN missions USING (mission_id) ORDER BY missions.position, scenes.position"
+            )
+            columns = SceneColumns.from_records(missions, [
+                {
+                    "scene_id": scene_id,
+                    "mission_id": mission_id,
+                    "mission_name": mission_name,
+                    "coordinates": json.loads(coordinates),
+                    "area": area,
+                    "centre_point": None if centre_lon is None else (centre_lon, centre_lat),
+                    "aircraftTakeOffTime": aircraft_takeoff_time,
+                    "objectstartdate": objectstartdate,
+                    "region": region,
+                }
+                for (scene_id, mission_id, mission_name, coordinates, area, centre_lon, centre_lat,
+                     aircraft_takeoff_time, objectstartdate, region) in rows
+            ])
+
+            self.watermark = read_watermark(conn, meta)
+        finally:
+            conn.close()
+
+        # Scenes outside every region are saved without one too, so only a change of
+        # boundaries (including gaining or losing them) means the join has to be redone
+        saved_columns = columns
+        if meta.get("regions_source") != REGIONS_SOURCE:
+            columns = copy.copy(columns)
+            columns.regions = assign_regions(columns.centres, columns.footprints())
+
+        with self._lock:
+            self.columns = columns
+            self.generation = meta["generation"]
+            self.token = meta["token"]
+            # The next save writes only the rows that differ from the database, e.g. reassigned regions
+            self._saved = (
+                self.token, saved_columns,
+                {key: set(self.watermark[key]) for key in ("mission_ids", "scene_ids")},
+            )
+            self.synced_at = meta.get("synced_at")
+            self.full_synced_at = meta.get("full_synced_at")
+            self._derived = {}
+        return True
+
+    def reload_if_newer(self, path):
+        """Picks up a sync another worker saved to path. Returns True if there was one."""
+        try:
+            conn = connect_db(path)
+            try:
+                meta = dict(conn.execute("SELECT key, value FROM meta"))
+                # A sync without new scenes only moves the timestamps, and possibly the watermark
+                resynced = (
+                    meta.get("token") == self.token
+                    and (meta.get("synced_at") or 0) > (self.synced_at or 0)
+                )
+                watermark = read_watermark(conn, meta) if resynced else None
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print("⚠️ Could not read scene store database:", e)
+            return False
+
+        if "token" not in meta:
+            return False
+        if meta["token"] != self.token:
+            return self.load(path)
+        if watermark is None:
+            return False
+        with self._lock:
+            self.synced_at = meta["synced_at"]
+            self.full_synced_at = meta.get("full_synced_at")
+            self.watermark = watermark
+            if self._saved is not None:
+                # The database already holds this watermark, so the next save diffs against it
+                self._saved = (
+                    self._saved[0], self._saved[1],
+                    {key: set(watermark[key]) for key in ("mission_ids", "scene_ids")},
+                )
+        return True
+
+    def coverage_items(self):
+        """(mission_id, entry) pairs of the mission -> scene dictionary served by /coverage,
+        built one mission at a time."""
+        return self.columns.coverage_items()
+
+    def scene_bboxes(self, scenes=None):
+        """Scene footprints with their mission name, as served by /scenes.
+
+        Covers every scene unless a subset (e.g. SceneColumns.take of index().query) is given.
+        """
+        return (self.columns if scenes is None else scenes).bboxes()
+
+    def scene_features(self):
+        """Scene attributes with shapely footprints as columns, ready to load into a GeoDataFrame."""
+        return self.columns.features()
+
+class SceneIndex:
+    """STRtree over scene footprints plus per-scene time and mission arrays.
+
+    Scenes are numbered in store order; query() returns matching positions in
+    that order, so results page consistently within a generation. columns is
+    the snapshot the positions refer to.
+    """
+
+    def __init__(self, store):
+        self.columns = store.columns
+        self.tree = shapely.STRtree(self.columns.footprints())
+        # Scenes without an objectstartdate fall back to their mission's takeoff time
+        self.times = self.columns.times()
+        self.mission_ids = self.columns.mission_ids[self.columns.missions]
+        self.mission_names = self.columns.mission_names
+
+    def query(self, bbox=None, start=None, end=None, mission=None):
+        """Positions of scenes overlapping bbox (min_lon, min_lat, max_lon, max_lat),
+        dated within [start, end] and belonging to mission (id or name)."""
+        matches = np.ones(len(self.columns), dtype=bool)
+        if bbox is not None:
+            in_bbox = np.zeros(len(self.columns), dtype=bool)
+            in_bbox[self.tree.query(shapely.box(*bbox), predicate="intersects")] = True
+            matches &= in_bbox
+        if start is not None:
+            matches &= self.times >= start
+        if end is not None:
+            matches &= self.times <= end
+        if mission is not None:
+            matches &= (self.mission_ids == mission) | (self.mission_names == mission)
+        return np.flatnonzero(matches)
+
+def needs_scan(mission, watermark):
+    """Whether a mission's scene list has to be read on this sync."""
+    if watermark is None or mission.get("id") not in watermark["mission_ids"]:
+        return True
+    takeoff = mission.get("aircraftTakeOffTime")
+    last_takeoff = watermark["last_takeoff"]
+    return isinstance(takeoff, (int, float)) and last_takeoff is not None \
+        and takeoff >= last_takeoff - RESCAN_WINDOW * 1000
+
+async def ingest_async(watermark=None):
+    """Crawls the Discover API and returns what was fetched (None on failure).
+
+    With a watermark only unknown or recent missions have their scene list read,
+    and only scenes not already fetched have their product metadata requested.
+    Without one everything is fetched.
+
+    Mission scene lists are fetched concurrently and each one feeds its scene ids
+    into a single queue drained by MAX_IN_FLIGHT workers, so product lookups for
+    every mission share one pipeline instead of waiting mission by mission.
+    Runs on the background loop and uses its shared ClientSession.
+    """
+    # Token renewal is a blocking request, so keep it off the event loop
+    headers = await asyncio.to_thread(get_headers)
+    session = await background_loop.session()
+    mission_list = await fetch_mission_list_async(session, headers)
+    if mission_list is None:
+        return None
+
+    missions = mission_list.get("missions", [])
+    ingest = {
+        "missions": [
+            (mission.get("id", "Unknown"), epoch_ms_to_iso(mission.get("aircraftTakeOffTime")))
+            for mission in missions
+        ],
+        "scenes": {},
+        # Scene ids listed for each mission whose scene list was fetched
+        "scene_order": {},
+        # Missions whose scene list and scenes were all fetched
+        "scanned_missions": set(),
+        "fetched_scenes": set(),
+        # Missions whose scene list or a scene's metadata could not be fetched
+        "failed_missions": set(),
+        "failed_scenes": set(),
+        "last_takeoff": None,
+    }
+    scene_order = ingest["scene_order"]
+    queue = asyncio.Queue()
+
+    async def produce(mission):
+        mission_id = mission.get("id", "Unknown")
+        scenes_data = await fetch_scenes_from_mission_async(session, mission_id, headers)
+        if scenes_data is None:
+            print("⚠️ Skipping mission whose scenes could not be fetched:", mission_id)
+            ingest["failed_missions"].add(mission_id)
+            return
+
+        try:
+            scene_ids = [scene.get("id") for scene in scenes_data.get("scenes", [])]
+        except Exception as e:
+            print("⚠️ Skipping mission whose scene list could not be parsed:", mission_id, e)
+            ingest["failed_missions"].add(mission_id)
+            return
+
+        ingest["scenes"][mission_id] = {}
+        takeoff = mission.get("aircraftTakeOffTime")
+        if isinstance(takeoff, (int, float)):
+            ingest["last_takeoff"] = max(ingest["last_takeoff"] or 0, takeoff)
+
+        scene_order[mission_id] = scene_ids
+        aircraft_takeoff_time = epoch_ms_to_iso(takeoff)
+        for scene_id in scene_order[mission_id]:
+            if watermark is None or scene_id not in watermark["scene_ids"]:
+                queue.put_nowait((mission_id, scene_id, aircraft_takeoff_time))
+
+    async def consume():
+        while True:
+            mission_id, scene_id, aircraft_takeoff_time = await queue.get()
+            try:
+                scene_data = await fetch_product_metadata_async(session, scene_id, headers)
+                if scene_data is None:
+                    ingest["failed_scenes"].add(scene_id)
+                    ingest["failed_missions"].add(mission_id)
+                else:
+                    # Seen even without a usable footprint, so it is not refetched
+                    ingest["fetched_scenes"].add(scene_id)
+                    scene = parse_scene(mission_id, scene_id, scene_data, aircraft_takeoff_time)
+                    if scene is not None:
+                        ingest["scenes"][mission_id][scene_id] = scene
+            except Exception as e:
+                print("⚠️ Skipping scene that could not be parsed:", scene_id, e)
+            finally:
+                queue.task_done()
+
+    workers = [asyncio.create_task(consume()) for _ in range(MAX_IN_FLIGHT)]
+    producers = [asyncio.create_task(produce(mission)) for mission in missions if needs_scan(mission, watermark)]
+    try:
+        await asyncio.gather(*producers)
+        await queue.join()
+    finally:
+        # The loop outlives the crawl, so no task may be left waiting on it, even after an error
+        for task in workers + producers:
+            task.cancel()
+        await asyncio.gather(*workers, *producers, return_exceptions=True)
+    ingest["scanned_missions"] = set(scene_order) - ingest["failed_missions"]
+
+    # Restore API order, which completion order does not preserve
+    for mission_id, scenes in ingest["scenes"].items():
+        ingest["scenes"][mission_id] = {
+            scene_id: scenes[scene_id] for scene_id in scene_order[mission_id] if scene_id in scenes
+        }
+
+    new_scenes = [scene for scenes in ingest["scenes"].values() for scene in scenes.values()]
+    footprints = footprint_polygons([scene["coordinates"] for scene in new_scenes])
+    centres = np.array([scene["centre_point"] or (np.nan, np.nan) for scene in new_scenes], dtype=float)
+    regions = assign_regions(centres.reshape(-1, 2), footprints)
+    for scene, area, region in zip(new_scenes, calculate_areas(footprints), regions):
+        scene["area"] = float(area)
+        scene["region"] = region
+    return ingest
+
+store = SceneStore()
+store.load(DB_PATH)
+_sync_lock = threading.Lock()
+
+def sync(full=False):
+    """Brings the store up to date with the Discover API. Returns False if the crawl failed.
+
+    Incremental unless full is set, the store is empty or the last full crawl is
+    older than FULL_SYNC_INTERVAL. The result is saved to DB_PATH.
+    """
+    with _sync_lock:
+        full = full or store.needs_full_sync()
+        ingest = background_loop.run(ingest_async(None if full else store.watermark))
+        if ingest is None:
+            return False
+
+        store.merge(ingest, full=full)
+        new_scenes = sum(len(scenes) for scenes in ingest["scenes"].values())
+        print(f"Scene store generation {store.generation} ({'full' if full else 'incremental'}): "
+              f"{new_scenes} scenes fetched, {len(store.columns)} held, fetch stats {fetch_stats}")
+        try:
+            store.save(DB_PATH)
+        except (OSError, sqlite3.Error) as e:
+            print("⚠️ Could not save scene store database:", e)
+        return True
+
+def last_sync_failure(path):
+    """When the last sync by any worker failed, or None if it succeeded."""
+    try:
+        conn = connect_db(path)
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'last_failure'").fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        print("⚠️ Could not read scene store database:", e)
+        return None
+    return None if row is None else row[0]
+
+def record_sync_failure(path, failed_at):
+    """Shares a sync's outcome with the other workers: failed_at, or None after a success."""
+    try:
+        conn = connect_db(path)
+        try:
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('last_failure', ?)", (failed_at,))
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        print("⚠️ Could not save scene store database:", e)
+
+def refresh():
+    """Syncs if this worker wins the host-wide refresh lock, else adopts the winner's result.
+
+    Returns True once the store is fresh, False if this worker's sync failed
+    (or any worker's did within RETRY_INTERVAL) and None while another worker's
+    sync is still running.
+    """
+    if fcntl is None:
+        return sync()
+
+    os.makedirs(DATA_DIR, exist_ok=True)
+    with open(REFRESH_LOCK_PATH, "a") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            store.reload_if_newer(DB_PATH)
+            return None if store.is_stale() else True
+
+        try:
+            # The previous lock holder may have synced just before releasing it
+            store.reload_if_newer(DB_PATH)
+            if not store.is_stale():
+                return True
+            # Back off with the worker whose sync just failed instead of crawling again after it
+            failed_at = last_sync_failure(DB_PATH)
+            if failed_at is not None and time.time() - failed_at < RETRY_INTERVAL:
+                return False
+
+            ok = False
+            try:
+                ok = sync()
+            finally:
+                record_sync_failure(DB_PATH, None if ok else time.time())
+            return ok
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+class Refresher:
+    """Keeps the store fresh from background threads so requests never wait on a crawl.
+
+    A scheduler thread refreshes whenever the store goes stale, and requests
+    that find it stale only trigger a refresh. Concurrent triggers share one
+    in-flight refresh, and across workers refresh() lets only one of them
+    crawl the API. After a failed sync the next attempt waits RETRY_INTERVAL,
+    in this worker and (through refresh()) in the others, so an upstream outage
+    is not retried on every request. Threads are
+    started lazily, and again in a forked gunicorn worker.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._done = threading.Event()
+        self.refreshing = False
+        self.last_failure = None
+
+    def _start(self):
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._done = threading.Event()
+            self.refreshing = False
+            self.last_failure = None
+            threading.Thread(target=self._schedule, name="scene-store-refresher", daemon=True).start()
+
+    def trigger(self):
+        """Starts a refresh unless one is running or backing off. Returns an Event set when it ends."""
+        with self._lock:
+            self._start()
+            backing_off = self.last_failure is not None and time.time() - self.last_failure < RETRY_INTERVAL
+            if not self.refreshing and not backing_off:
+                self.refreshing = True
+                self._done = threading.Event()
+                threading.Thread(target=self._run, args=(self._done,), daemon=True).start()
+            return self._done
+
+    def _run(self, done):
+        try:
+            # Wait for another worker's sync rather than crawling alongside it
+            ok = refresh()
+            while ok is None:
+                time.sleep(FOLLOW_INTERVAL)
+                ok = refresh()
+        except Exception as e:
+            print("⚠️ Scene store sync failed:", e)
+            ok = False
+        with self._lock:
+            self.refreshing = False
+            self.last_failure = None if ok else time.time()
+        done.set()
+
+    def _schedule(self):
+        while True:
+            if store.is_stale():
+                self.trigger().wait()
+            # Check again when the store is due, and at least every RETRY_INTERVAL
+            due = REFRESH_INTERVAL if store.synced_at is None else store.synced_at + REFRESH_INTERVAL - time.time()
+            time.sleep(max(min(due, RETRY_INTERVAL), 1))
+
+    def status(self):
+        """Age and refresh state of the snapshot being served."""
+        return {
+            "generation": store.generation,
+            "synced_at": store.synced_at,
+            "full_synced_at": store.full_synced_at,
+            "age": None if store.synced_at is None else time.time() - store.synced_at,
+            "stale": store.is_stale(),
+            "refreshing": self.refreshing,
+            "last_failure": self.last_failure,
+        }
+
+refresher = Refresher()
+
+def get_store():
+    """Returns the shared store without waiting for a refresh.
+
+    A stale store is served as-is while a background sync brings it up to date.
+    Only a store that has never been populated waits, on the one in-flight sync,
+    and None is returned if that sync failed.
+    """
+    if store.synced_at is None:
+        refresher.trigger().wait()
+        return store if store.synced_at is not None else None
+    if store.is_stale():
+        refresher.trigger()
+    return store
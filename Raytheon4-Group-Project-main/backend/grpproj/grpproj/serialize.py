@@ -0,0 +1,119 @@
+"""
+Incremental JSON serialization for large scene and GeoJSON payloads.
+
+Payloads are produced as a stream of byte chunks, so a response can start
+before the last feature is encoded and no full intermediate dict or string is
+built. Coordinate arrays bypass the generic encoder and can be rounded to a
+fixed number of decimals, or quantized and delta-encoded.
+
+Delta encoding works like TopoJSON's quantized arcs: every coordinate is
+multiplied by 10**precision and rounded to an integer; in each array of
+positions the first position is absolute and every later one is the
+difference from the one before. Decoding is a running sum divided by the scale.
+"""
+
+import json
+import os
+
+# Decimals kept in coordinates; unset keeps full float precision
+COORDINATE_PRECISION = os.environ.get("COORDINATE_PRECISION")
+COORDINATE_PRECISION = int(COORDINATE_PRECISION) if COORDINATE_PRECISION else None
+# Decimals kept by delta encoding when no precision is given (about 0.1 m)
+DELTA_PRECISION = 6
+# Highest precision a client may ask for; doubles carry about 15 significant digits
+MAX_PRECISION = 15
+# Members holding a position or nested arrays of positions
+COORDINATE_KEYS = frozenset({"coordinates", "centre_point"})
+# Items encoded per yielded chunk
+CHUNK_ITEMS = 256
+
+def delta_json(positions, scale):
+    """Quantizes an array of 2D positions and encodes all but the first as differences."""
+    parts = []
+    previous_x = previous_y = 0
+    for x, y in positions:
+        x, y = round(x * scale), round(y * scale)
+        parts.append("[%d,%d]" % (x - previous_x, y - previous_y))
+        previous_x, previous_y = x, y
+    return "[" + ",".join(parts) + "]"
+
+def coordinates_json(coordinates, precision=None, delta=False):
+    """Encodes a position or nested arrays of positions, rounding to precision decimals.
+
+    With delta set the coordinates are quantized and delta-encoded instead
+    (see the module docstring), using DELTA_PRECISION if precision is None.
+    """
+    if coordinates is None:
+        return "null"
+    if not len(coordinates):
+        return "[]"
+
+    if delta:
+        scale = 10 ** (DELTA_PRECISION if precision is None else precision)
+        first = coordinates[0]
+        if isinstance(first, (int, float)):
+            return "[" + ",".join(["%d" % round(value * scale) for value in coordinates]) + "]"
+        if len(first) == 2 and isinstance(first[0], (int, float)):
+            return delta_json(coordinates, scale)
+        return "[" + ",".join([coordinates_json(part, precision, delta) for part in coordinates]) + "]"
+
+    # Fixed-point formatting is several times faster than rounding and repr()
+    number = "%r" if precision is None else f"%.{precision}f"
+
+    first = coordinates[0]
+    if isinstance(first, (int, float)):
+        return "[" + ",".join([number % value for value in coordinates]) + "]"
+
+    if len(first) == 2 and isinstance(first[0], (int, float)):
+        # A ring or line of 2D positions, formatted in one pass
+        pair = f"[{number},{number}]"
+        return "[" + ",".join([pair % (x, y) for x, y in coordinates]) + "]"
+
+    return "[" + ",".join([coordinates_json(part, precision) for part in coordinates]) + "]"
+
+def dumps(value, precision=None, delta=False):
+    """Compact JSON for value, with coordinate members encoded by coordinates_json."""
+    if isinstance(value, dict):
+        return "{" + ",".join([
+            json.dumps(str(key)) + ":" + (
+                coordinates_json(item, precision, delta) if key in COORDINATE_KEYS
+                else dumps(item, precision, delta)
+            )
+            for key, item in value.items()
+        ]) + "}"
+    return json.dumps(value, separators=(",", ":"))
+
+def iter_chunks(opening, encoded_items, closing):
+    """Yields opening, the comma-separated items in batches of CHUNK_ITEMS, then closing, as bytes."""
+    yield opening.encode()
+    batch = []
+    separator = ""
+    for item in encoded_items:
+        batch.append(item)
+        if len(batch) == CHUNK_ITEMS:
+            yield (separator + ",".join(batch)).encode()
+            batch = []
+            separator = ","
+    if batch:
+        yield (separator + ",".join(batch)).encode()
+    yield closing.encode()
+
+def iter_object(items, precision=None, delta=False):
+    """Streams a JSON object from (key, value) pairs."""
+    return iter_chunks(
+        "{", (json.dumps(str(key)) + ":" + dumps(value, precision, delta) for key, value in items), "}"
+    )
+
+def iter_collection(name, items, precision=None, delta=False, head=None, tail=None):
+    """Streams an object whose member name is the array of items, between the members of head and tail."""
+    opening = "{" + "".join(json.dumps(key) + ":" + dumps(value) + "," for key, value in (head or {}).items())
+    closing = "]" + "".join("," + json.dumps(key) + ":" + dumps(value) for key, value in (tail or {}).items())
+    return iter_chunks(
+        opening + json.dumps(name) + ":[",
+        (dumps(item, precision, delta) for item in items),
+        closing + "}",
+    )
+
+def iter_feature_collection(features, precision=None, delta=False, members=None):
+    """Streams a GeoJSON FeatureCollection, followed by any extra top-level members."""
+    return iter_collection("features", features, precision, delta, {"type": "FeatureCollection"}, members)
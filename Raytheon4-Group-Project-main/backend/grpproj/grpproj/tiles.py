@@ -0,0 +1,148 @@
+"""
+Mapbox Vector Tiles of the land-clipped scene footprints.
+"""
+
+import os
+import shutil
+import threading
+from collections import OrderedDict
+
+import mapbox_vector_tile
+import numpy as np
+import shapely
+from pyproj import Transformer
+from shapely.geometry import shape
+
+from grpproj.scene_store import DATA_DIR
+
+TILE_DIR = os.path.join(DATA_DIR, "tiles")
+TILE_LAYER = "scenes"
+TILE_EXTENT = 4096
+# Extra margin around each tile, in tile units, so outlines do not break at tile edges
+TILE_BUFFER = 64
+# Geometries are simplified to this many tile units at every zoom
+TILE_SIMPLIFY = 1.0
+MAX_TILE_ZOOM = 22
+# Rendered tiles kept in memory per store generation
+TILE_CACHE_SIZE = int(os.environ.get("TILE_CACHE_SIZE", 2048))
+# Feature properties carried into the tiles
+TILE_PROPERTIES = ("scene_id", "mission_name", "objectstartdate", "aircrafttakeofftime")
+
+# Half the width of the Web Mercator world, in metres
+MERCATOR_HALF_WORLD = 20037508.342789244
+to_mercator = Transformer.from_crs("EPSG:4326", "EPSG:3857", always_xy=True)
+
+def tile_bounds(z, x, y):
+    """Web Mercator bounds (min_x, min_y, max_x, max_y) of an XYZ tile."""
+    size = 2 * MERCATOR_HALF_WORLD / 2 ** z
+    min_x = -MERCATOR_HALF_WORLD + x * size
+    max_y = MERCATOR_HALF_WORLD - y * size
+    return min_x, max_y - size, min_x + size, max_y
+
+def is_valid_tile(z, x, y):
+    return 0 <= z <= MAX_TILE_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+class SceneTiles:
+    """Scene footprints in Web Mercator with an STRtree, and the tiles rendered from them.
+
+    One instance serves one store generation, so its caches never need
+    invalidating: a new generation gets a new instance and a new disk
+    directory, named after the generation's token.
+    """
+
+    def __init__(self, token, features):
+        self.token = token
+        features = list(features)
+        geometries = np.array([shape(feature["geometry"]) for feature in features], dtype=object)
+        self.geometries = shapely.transform(
+            geometries,
+            lambda xy: np.column_stack(to_mercator.transform(xy[:, 0], xy[:, 1])),
+        )
+        self.scene_ids = [feature["properties"]["scene_id"] for feature in features]
+        self.properties = [
+            {key: feature["properties"][key] for key in TILE_PROPERTIES if feature["properties"].get(key) is not None}
+            for feature in features
+        ]
+        self.tree = shapely.STRtree(self.geometries)
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_dir = os.path.join(TILE_DIR, token)
+
+    def tile(self, z, x, y, query=None, select=None):
+        """Returns the encoded tile, limited to the scenes of a filtered query if given.
+
+        query is a hashable key of the filter arguments and select returns the
+        frozenset of scene ids they allow. select only runs when the tile is not
+        cached, so repeat requests skip the scene query.
+        """
+        key = (z, x, y, query)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        # Only unfiltered tiles are worth keeping on disk
+        body = self._read(z, x, y) if query is None else None
+        if body is None:
+            body = self.render(z, x, y, None if query is None else select())
+            if query is None:
+                self._write(z, x, y, body)
+
+        with self._lock:
+            self._cache[key] = body
+            while len(self._cache) > TILE_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return body
+
+    def render(self, z, x, y, scene_ids=None):
+        bounds = tile_bounds(z, x, y)
+        unit = (bounds[2] - bounds[0]) / TILE_EXTENT
+        margin = TILE_BUFFER * unit
+        buffered = (bounds[0] - margin, bounds[1] - margin, bounds[2] + margin, bounds[3] + margin)
+
+        hits = self.tree.query(shapely.box(*buffered), predicate="intersects")
+        if scene_ids is not None:
+            hits = np.array([i for i in hits if self.scene_ids[i] in scene_ids], dtype=int)
+        hits.sort()
+
+        geometries = shapely.clip_by_rect(self.geometries[hits], *buffered)
+        geometries = shapely.simplify(geometries, TILE_SIMPLIFY * unit, preserve_topology=True)
+
+        features = [
+            {"geometry": geometry, "properties": self.properties[i]}
+            for i, geometry in zip(hits, geometries)
+            if not geometry.is_empty
+        ]
+        return mapbox_vector_tile.encode(
+            [{"name": TILE_LAYER, "features": features}],
+            default_options={"quantize_bounds": bounds, "extents": TILE_EXTENT},
+        )
+
+    def _path(self, z, x, y):
+        return os.path.join(self._disk_dir, str(z), str(x), f"{y}.mvt")
+
+    def _read(self, z, x, y):
+        try:
+            with open(self._path(z, x, y), "rb") as file:
+                return file.read()
+        except OSError:
+            return None
+
+    def _write(self, z, x, y, body):
+        path = self._path(z, x, y)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as file:
+                file.write(body)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ Could not cache tile {z}/{x}/{y}: {e}")
+
+def remove_stale_tiles(token):
+    """Deletes disk tiles of every generation except the one with the given token."""
+    if not os.path.isdir(TILE_DIR):
+        return
+    for name in os.listdir(TILE_DIR):
+        if name != token:
+            shutil.rmtree(os.path.join(TILE_DIR, name), ignore_errors=True)
@@ -1,18 +1,85 @@
 from datetime import datetime
-from flask import render_template, send_from_directory, jsonify, request, current_app
+from flask import render_template, send_from_directory, jsonify, request, current_app, Response
 from grpproj import app
-import os
 import json
+import os
 import requests
-import asyncio
-import aiohttp
-from shapely.geometry import shape, Polygon, mapping, MultiPolygon
+import numpy as np
 from geopandas import gpd
 from flask_caching import Cache
-from shapely.ops import unary_union
-
-# Global dictionary to hold missions data
-missions_Dictionary = {}
+from grpproj.discover import get_access_token, token_manager
+from grpproj.geometry import Land
+from grpproj.heatmap import HEATMAP_DEFAULT_ZOOM, HeatmapGrids, grid_zoom
+from grpproj.payload_cache import PayloadCache
+from grpproj.regions import counties
+from grpproj.scene_arrow import ARROW_MIMETYPE, scene_table, to_stream
+from grpproj.scene_store import DATA_DIR, REFRESH_INTERVAL, get_store, refresher
+from grpproj.serialize import (
+    COORDINATE_PRECISION, DELTA_PRECISION, MAX_PRECISION, iter_collection, iter_feature_collection, iter_object,
+)
+from grpproj.tiles import SceneTiles, is_valid_tile, remove_stale_tiles
+
+base_dir = os.path.abspath(os.path.dirname(__file__))
+project_root = os.path.abspath(os.path.join(base_dir, "..", "..", ".."))
+LAND_PATH = os.path.join(project_root, "frontend", "public", "assets", "gb_land.geojson.json")
+# Tolerance in degrees for simplifying the land outline (0 keeps it exact)
+LAND_SIMPLIFY_TOLERANCE = float(os.environ.get("LAND_SIMPLIFY_TOLERANCE", 0))
+
+# Load the land outline once per worker rather than on every /clipped-scenes request
+try:
+    land = Land(LAND_PATH, LAND_SIMPLIFY_TOLERANCE)
+except Exception as e:
+    print(f"⚠️ Could not load land outline from {LAND_PATH}: {e}")
+    land = None
+
+# Serialized payloads are shared by every gunicorn worker on the host: on disk
+# by default, or in Redis with CACHE_TYPE=RedisCache and CACHE_REDIS_URL.
+# Keys include the store generation's token, so entries only need to outlive it.
+cache = Cache(app, config={
+    "CACHE_TYPE": os.environ.get("CACHE_TYPE", "FileSystemCache"),
+    "CACHE_DIR": os.environ.get("CACHE_DIR", os.path.join(DATA_DIR, "cache")),
+    "CACHE_REDIS_URL": os.environ.get("CACHE_REDIS_URL", "redis://localhost:6379/0"),
+    "CACHE_DEFAULT_TIMEOUT": 2 * REFRESH_INTERVAL,
+})
+
+def json_payload(value):
+    """Compact JSON bytes for a cached body (app.json pads separators and sorts keys)."""
+    return json.dumps(value, separators=(",", ":")).encode()
+
+def payload_response(body, etag, mimetype="application/json"):
+    """Serves a cached payload, answering a matching If-None-Match with a 304."""
+    response = Response(body, mimetype=mimetype)
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+def parse_coordinate_format(args):
+    """(precision, delta) from the precision and encoding query arguments.
+
+    precision is the number of decimals kept (COORDINATE_PRECISION if absent);
+    encoding=delta asks for quantized, delta-encoded coordinates instead of
+    decimals. Raises ValueError for anything else.
+    """
+    precision = COORDINATE_PRECISION
+    if "precision" in args:
+        precision = int(args["precision"])
+        if not 0 <= precision <= MAX_PRECISION:
+            raise ValueError(f"precision must be between 0 and {MAX_PRECISION}")
+
+    encoding = args.get("encoding", "decimal")
+    if encoding not in ("decimal", "delta"):
+        raise ValueError("encoding must be decimal or delta")
+    return precision, encoding == "delta"
+
+# (precision, delta) pairs whose full payloads are cached: the default and the
+# precision=5 the frontend requests. Other formats are streamed on demand.
+CACHED_COORDINATE_FORMATS = {(COORDINATE_PRECISION, False), (5, False)}
+
+def coordinate_response(response, precision, delta):
+    """Tells clients how to decode delta-encoded coordinates: divide the running sums by the scale."""
+    if delta:
+        response.headers["X-Coordinate-Encoding"] = "delta"
+        response.headers["X-Coordinate-Scale"] = str(10 ** (DELTA_PRECISION if precision is None else precision))
+    return response
 
 # Serve the Svelte index.html
 @app.route("/")
@@ -61,325 +128,235 @@ def about():
         message='Your application description page.'
     )
 
-# API Details
-API_BASE_URL = "..."
-USERNAME = "..."
-PASSWORD = "..."
-CLIENT_ID = "..."
-CLIENT_SECRET = "..."
+@app.route("/status", methods=["GET"])
+def get_status():
+    """Flask route to report the age and refresh state of the scene store snapshot."""
+    return jsonify(refresher.status())
 
-encoded_password = requests.compat.quote_plus(PASSWORD)
+def build_coverage(store, precision, delta):
+    return b"".join(iter_object(store.coverage_items(), precision, delta))
 
-# Function to get API token
-def get_access_token():
-    payload = f"grant_type=password&username={USERNAME}&password={encoded_password}"
-    headers = {
-        "Content-Type": "application/x-www-form-urlencoded",
-        "Accept": "*/*",
-        "Host": "hallam.sci-toolset.com"
-    }
-    response = requests.post(
-        f"{API_BASE_URL}/api/v1/token",
-        auth=(CLIENT_ID, CLIENT_SECRET),
-        data=payload,
-        headers=headers,
-        verify=False
-    )
-    if response.status_code == 200:
-        return response.json().get("access_token")
-    return None
-
-def get_headers():
-    headers = {
-        "Authorization": f"Bearer {get_access_token()}",
-        "Content-Type": "application/json",
-        "Accept": "*/*",
-    }
-    return headers
-
-async def async_fetch(session, url, headers):
-    """Helper function to fetch API data asynchronously."""
-    async with session.get(url, headers=headers, ssl=False) as response:
-        return await response.json()
-
-async def fetch_scenes_from_mission_async(session, mission_id, headers):
-    """Asynchronously fetches scene data for a mission."""
-    url = f"{API_BASE_URL}/discover/api/v1/missionfeed/missions/{mission_id}"
-    return await async_fetch(session, url, headers)
-
-async def fetch_product_metadata_async(session, scene_id, headers):
-    """Asynchronously fetches product metadata for a scene."""
-    url = f"{API_BASE_URL}/discover/api/v1/products/{scene_id}"
-    return await async_fetch(session, url, headers)
-
-def calculate_scene_area(coordinates):
-    if not isinstance(coordinates, list):
-        raise ValueError("Coordinates must be a list of (longitude, latitude) points.")
-    
-    # Create Polygon and check validity
-    polygon = Polygon(coordinates)
-    if not polygon.is_valid:
-        polygon = polygon.buffer(0)
-    
-    # Create GeoDataFrame with WGS 84 (EPSG:4326)
-    gdf = gpd.GeoDataFrame({'geometry': [polygon]}, crs="EPSG:4326")
-    
-    # Determine UTM zone based on centroid
-    lon, lat = polygon.centroid.x, polygon.centroid.y
-    utm_zone = int((lon + 180) / 6) + 1
-    utm_crs = f"EPSG:{32600 + utm_zone}" if lat >= 0 else f"EPSG:{32700 + utm_zone}"
-    
-    # Convert to UTM projection
-    gdf = gdf.to_crs(utm_crs)
-    
-    # Calculate area in square kilometers
-    area_km2 = gdf.geometry.area.iloc[0] / 1_000_000
-    
-    return area_km2
-
-def calculate_region_area(coordinates):
-    if not isinstance(coordinates, list):
-        raise ValueError("Coordinates must be a list.")
-    
-    # Check if it's a Polygon or MultiPolygon
-    if isinstance(coordinates[0][0][0], (int, float)):  # Polygon case
-        polygon = Polygon(coordinates[0])
-    else:  # MultiPolygon case
-        polygons = [Polygon(ring[0]) for ring in coordinates]
-        polygon = MultiPolygon(polygons)
-    
-    # Ensure the geometry is valid
-    if not polygon.is_valid:
-        polygon = polygon.buffer(0)  # Fix invalid geometry
-    
-    # Create a GeoDataFrame
-    gdf = gpd.GeoDataFrame({'geometry': [polygon]}, crs="EPSG:4326")
-    
-    # Determine the best UTM zone for projection
-    centroid = polygon.centroid
-    utm_zone = int((centroid.x + 180) / 6) + 1  # UTM Zone formula
-    utm_crs = f"EPSG:{32600 + utm_zone}" if centroid.y >= 0 else f"EPSG:{32700 + utm_zone}"  # 326XX for northern, 327XX for southern
-
-    # Reproject to UTM and calculate area
-    gdf = gdf.to_crs(utm_crs)
-    area_km2 = gdf.geometry.area.iloc[0] / 1_000_000  # Convert m² to km²
-
-    return area_km2
-
-@app.route('/updateRegion')
-def update_region_area():
-    base_dir = os.path.abspath(os.path.dirname(__file__))
-    project_root = os.path.abspath(os.path.join(base_dir, "..", "..", ".."))
-
-    file_path = os.path.join(project_root, "frontend", "public", "assets", "uk-counties.geojson")
-    print(file_path)
-    try:
-        # Load the GeoJSON file
-        with open(file_path, "r") as file:
-            countyDict = json.load(file)
-
-        # Calculate area and add it to each feature's properties
-        for feature in countyDict["features"]:
-            # Ensure geometry and coordinates exist
-            geometry = feature.get("geometry", {})
-            coordinates = geometry.get("coordinates")
-
-            if coordinates:
-                geom_type = geometry.get("type")
-                if geom_type == "Polygon":
-                    area = calculate_region_area(coordinates)
-                elif geom_type == "MultiPolygon":
-                    # For MultiPolygon, sum areas of each polygon
-                    area = sum(calculate_region_area(polygon) for polygon in coordinates)
-                else:
-                    print(f"Unsupported geometry type: {geom_type}")
-                    continue
-
-                feature["properties"]["area"] = area
-            else:
-                return(f"Missing geometry or coordinates for feature: {feature.get('properties', {}).get('name', 'Unknown')}")
-
-        # Save the updated GeoJSON back to the file
-        with open(file_path, "w") as file:
-            json.dump(countyDict, file, indent=4)
-        
-        # Return success response
-        return("Region areas updated successfully.", 200)
-
-    except Exception as e:
-        # Return error response if something goes wrong
-        print(f"An error occurred: {str(e)}", 500)
-
-# Modified asynchronous function to update the global variable
-async def create_dictionary_async():
-    global missions_Dictionary  # Use the global variable
-    headers = get_headers()
-    async with aiohttp.ClientSession() as session:
-        mission_url = f"{API_BASE_URL}/discover/api/v1/missionfeed/missions"
-        async with session.get(mission_url, headers=headers, ssl=False) as response:
-            if response.status != 200:
-                return {"error": "Failed to fetch missions"}
-            
-            mission_list = await response.json()
-
-        mission_dict = {}
-
-        missions_tasks = [fetch_scenes_from_mission_async(session, mission["id"], headers) for mission in mission_list.get("missions", [])]
-        missions_results = await asyncio.gather(*missions_tasks)
-
-        for mission, scenes_data in zip(mission_list.get("missions", []), missions_results):
-            mission_id = mission.get("id", "Unknown")
-            scenes = scenes_data.get("scenes", [])
-            aircraft_takeoff_epoch = mission.get("aircraftTakeOffTime", "Unknown")
-
-            if aircraft_takeoff_epoch:
-                dtx = datetime.utcfromtimestamp(aircraft_takeoff_epoch / 1000)
-                aircraft_takeoff_epoch = dtx.isoformat()
-            else:
-                aircraft_takeoff_epoch = None
-
-                
-            scene_ids = [scene.get("id") for scene in scenes]
-
-            scene_tasks = [fetch_product_metadata_async(session, scene_id, headers) for scene_id in scene_ids]
-            scene_results = await asyncio.gather(*scene_tasks)
-
-            if mission_id not in mission_dict:
-                mission_dict[mission_id] = {}
-
-            for scene_id, scene_data in zip(scene_ids, scene_results):
-                coordinates = scene_data.get("product", {}).get("result", {}).get("footprint", {}).get("coordinates", [])
-                mission_name = scene_data.get("product", {}).get("result", {}).get("imagery", {}).get("missionname", [])
-                # Ensure coordinates are in the expected format
-                coordinates = coordinates[0]
-                centre_point = scene_data.get("product", {}).get("result", {}).get("centre", {})
-                object_start_date_epoch = scene_data.get("product", {}) \
-                                            .get("result", {}) \
-                                            .get("objectstartdate")
-                if object_start_date_epoch:
-                    dtx = datetime.utcfromtimestamp(object_start_date_epoch / 1000)
-                    object_start_date_epoch = dtx.isoformat()
-                else:
-                    object_start_date_epoch = None
-
-                if centre_point:
-                    lat, lon = map(float, centre_point.split(","))
-                    centre_point = (lon, lat)
-
-                if scene_id not in mission_dict[mission_id]:
-                    mission_dict[mission_id][scene_id] = {}
-                    
-                mission_dict[mission_id]["aircraftTakeOffTime"] = aircraft_takeoff_epoch
-                mission_dict[mission_id][scene_id]["coordinates"] = coordinates
-                mission_dict[mission_id][scene_id]["area"] = calculate_scene_area(coordinates)
-                mission_dict[mission_id][scene_id]["mission_name"] = mission_name
-                mission_dict[mission_id][scene_id]["centre_point"] = centre_point
-                mission_dict[mission_id][scene_id]["scene_id"] = scene_id
-                mission_dict[mission_id][scene_id]["aircraftTakeOffTime"] = aircraft_takeoff_epoch
-                mission_dict[mission_id][scene_id]["objectstartdate"] = object_start_date_epoch
-
-    # Update the global variable
-    missions_Dictionary = mission_dict
-    return mission_dict
-
-cache = Cache(app, config={'CACHE_TYPE': 'simple'})  # Use 'redis' for production
+coverage_cache = PayloadCache("coverage", build_coverage, cache)
 
 @app.route("/coverage", methods=["GET"])
-@cache.cached(timeout=3600)  # Cache for 1 hour
 def create_dictionary():
-    """Flask route to return mission coverage asynchronously with caching."""
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    result = loop.run_until_complete(create_dictionary_async())
-    return jsonify(result)
-
-async def get_heatmap_data_async():
-    headers = get_headers()
+    """Flask route to return mission coverage from the shared scene store.
 
-    async with aiohttp.ClientSession() as session:
-        mission_url = f"{API_BASE_URL}/discover/api/v1/missionfeed/missions"
-        async with session.get(mission_url, headers=headers, ssl=False) as response:
-            if response.status != 200:
-                return {"error": "Failed to fetch missions"}
-            
-            mission_list = await response.json()
+    precision and encoding control how coordinates are written (see
+    parse_coordinate_format).
+    """
+    store = get_store()
+    if store is None:
+        return jsonify({"error": "Failed to fetch missions"}), 500
 
-        heatmap_data = []
+    try:
+        precision, delta = parse_coordinate_format(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if (precision, delta) in CACHED_COORDINATE_FORMATS:
+        response = payload_response(*coverage_cache.get(store, precision, delta))
+    else:
+        response = Response(iter_object(store.coverage_items(), precision, delta), mimetype="application/json")
+    return coordinate_response(response, precision, delta)
+
+def parse_bbox(value):
+    bbox = [float(part) for part in value.split(",")]
+    if len(bbox) != 4:
+        raise ValueError("bbox must be min_lon,min_lat,max_lon,max_lat")
+    return bbox
+
+def heatmap_grids(store):
+    return store.derived("heatmap", lambda store: HeatmapGrids(store.index().tree.geometries))
+
+heatmap_cache = PayloadCache(
+    "heatmap", lambda store, zoom: json_payload(heatmap_grids(store).query(zoom)), cache
+)
 
-        missions_tasks = [fetch_scenes_from_mission_async(session, mission["id"], headers) for mission in mission_list.get("missions", [])]
-        missions_results = await asyncio.gather(*missions_tasks)
+@app.route("/heatmap", methods=["GET"])
+def get_heatmap_data():
+    """Flask route to return scene coverage binned onto a grid for the heatmap.
 
-        # Extract coordinates for the heatmap data
-        for mission, scenes_data in zip(mission_list.get("missions", []), missions_results):
-            scenes = scenes_data.get("scenes", [])
-            scene_ids = [scene.get("id") for scene in scenes]
+    zoom picks the grid resolution (the map's zoom level) and bbox limits the
+    cells returned.
+    """
+    store = get_store()
+    if store is None:
+        return jsonify({"error": "Failed to fetch missions"}), 500
 
-            scene_tasks = [fetch_product_metadata_async(session, scene_id, headers) for scene_id in scene_ids]
-            scene_results = await asyncio.gather(*scene_tasks)
+    try:
+        zoom = int(request.args.get("zoom", HEATMAP_DEFAULT_ZOOM))
+        bbox = parse_bbox(request.args["bbox"]) if "bbox" in request.args else None
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if bbox is not None:
+        return jsonify(heatmap_grids(store).query(zoom, bbox))
+    return payload_response(*heatmap_cache.get(store, grid_zoom(zoom)))
+
+# Query string arguments that narrow /scenes and /clipped-scenes
+SCENE_QUERY_ARGS = ("bbox", "start", "end", "mission", "limit", "cursor")
+
+def parse_date(value, end_of_period=False):
+    """Parses an ISO date or datetime to milliseconds.
+
+    An end bound covers the whole period written, so end=2021 runs to the last
+    millisecond of 2021 and end=2021-06-01T12 to the end of that hour.
+    """
+    date = np.datetime64(value)
+    if end_of_period and np.datetime_data(date.dtype)[0] in ("Y", "M", "W", "D", "h", "m", "s"):
+        # The start of the next period, less one millisecond
+        return (date + 1).astype("datetime64[ms]") - np.timedelta64(1, "ms")
+    return date.astype("datetime64[ms]")
+
+def select_scenes(store, keep=None):
+    """Scenes matching the request's bbox/start/end/mission filters, paged by limit/cursor.
+
+    keep optionally maps an array of scene ids to a mask of those the route can
+    serve, so pages are counted over those scenes only. Returns (scenes,
+    next_cursor), scenes as SceneColumns; next_cursor is None on the last page.
+    Raises ValueError for malformed arguments or a cursor from an older generation.
+    """
+    args = request.args
+    query = {}
+    if "bbox" in args:
+        query["bbox"] = parse_bbox(args["bbox"])
+    if "start" in args:
+        query["start"] = parse_date(args["start"])
+    if "end" in args:
+        query["end"] = parse_date(args["end"], end_of_period=True)
+    if "mission" in args:
+        query["mission"] = args["mission"]
+
+    index = store.index()
+    positions = index.query(**query)
+    if keep is not None:
+        positions = positions[keep(index.columns.scene_ids[positions])]
+
+    # Cursors are "<generation>:<position>" so a refresh cannot skip or repeat scenes silently
+    if "cursor" in args:
+        generation, _, position = args["cursor"].partition(":")
+        if int(generation) != store.generation:
+            raise ValueError("cursor has expired, restart from the first page")
+        positions = positions[positions >= int(position)]
+
+    next_cursor = None
+    if "limit" in args:
+        limit = int(args["limit"])
+        if limit < 1:
+            raise ValueError("limit must be positive")
+        if len(positions) > limit:
+            next_cursor = f"{store.generation}:{positions[limit]}"
+        positions = positions[:limit]
+
+    return index.columns.take(positions), next_cursor
+
+scenes_cache = PayloadCache(
+    "scenes",
+    lambda store, precision, delta: b"".join(iter_collection("scenes", store.scene_bboxes(), precision, delta)),
+    cache,
+)
 
-            for scene_id, scene_data in zip(scene_ids, scene_results):
-                coordinates = scene_data.get("product", {}).get("result", {}).get("footprint", {}).get("coordinates", [])
-                coordinates = coordinates[0]  # We assume this is a list of [lat, lon] pairs
+@app.route("/scenes", methods=["GET"])
+def get_scenes_data():
+    """Flask route to return scene bounding boxes, optionally filtered and paged.
 
-                # Add coordinates for the heatmap
-                for coord in coordinates:
-                    heatmap_data.append([coord[1], coord[0]])  # Convert (lat, lon) to (lon, lat)
+    precision and encoding control how coordinates are written (see
+    parse_coordinate_format).
+    """
+    store = get_store()
+    if store is None:
+        return jsonify({"error": "Failed to fetch missions"}), 500
 
-    return {"heatmap_data": heatmap_data}
+    scenes = tail = None
+    try:
+        precision, delta = parse_coordinate_format(request.args)
+        if any(arg in request.args for arg in SCENE_QUERY_ARGS):
+            scenes, next_cursor = select_scenes(store)
+            tail = {"next_cursor": next_cursor}
+        elif (precision, delta) in CACHED_COORDINATE_FORMATS:
+            response = payload_response(*scenes_cache.get(store, precision, delta))
+            return coordinate_response(response, precision, delta)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    chunks = iter_collection("scenes", store.scene_bboxes(scenes), precision, delta, tail=tail)
+    return coordinate_response(Response(chunks, mimetype="application/json"), precision, delta)
+
+scenes_arrow_cache = PayloadCache("scenes-arrow", lambda store: to_stream(scene_table(store.columns)), cache)
+
+@app.route("/scenes.arrow", methods=["GET"])
+def get_scenes_arrow():
+    """Flask route to return every scene as an Arrow IPC stream (see scene_arrow).
+
+    Accepts the same bbox/start/end/mission/limit/cursor arguments as /scenes;
+    the next page's cursor is sent in the X-Next-Cursor header.
+    """
+    store = get_store()
+    if store is None:
+        return jsonify({"error": "Failed to fetch missions"}), 500
+
+    if not any(arg in request.args for arg in SCENE_QUERY_ARGS):
+        return payload_response(*scenes_arrow_cache.get(store), mimetype=ARROW_MIMETYPE)
 
-@app.route("/heatmap", methods=["GET"])
-def get_heatmap_data():
-    """Flask route to return mission coordinates for heatmap asynchronously."""
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    result = loop.run_until_complete(get_heatmap_data_async())
-    return jsonify(result)
-
-async def get_scenes_data_async():
-    headers = get_headers()
-
-    async with aiohttp.ClientSession() as session:
-        mission_url = f"{API_BASE_URL}/discover/api/v1/missionfeed/missions"
-        async with session.get(mission_url, headers=headers, ssl=False) as response:
-            if response.status != 200:
-                return {"error": "Failed to fetch missions"}
-            
-            mission_list = await response.json()
-
-        scenes_data = []
-
-        missions_tasks = [fetch_scenes_from_mission_async(session, mission["id"], headers) for mission in mission_list.get("missions", [])]
-        missions_results = await asyncio.gather(*missions_tasks)
-
-        for mission, scenes_data_raw in zip(mission_list.get("missions", []), missions_results):
-            scenes = scenes_data_raw.get("scenes", [])
-            scene_ids = [scene.get("id") for scene in scenes]
-
-            scene_tasks = [fetch_product_metadata_async(session, scene_id, headers) for scene_id in scene_ids]
-            scene_results = await asyncio.gather(*scene_tasks)
-
-            for scene_id, scene_data in zip(scene_ids, scene_results):
-                coordinates = scene_data.get("product", {}).get("result", {}).get("footprint", {}).get("coordinates", [])
-
-                if coordinates:
-                    # Ensure coordinates are in the right structure
-                    bounding_box = coordinates[0]
-                    
-                    scenes_data.append({
-                        "scene_id": scene_id,
-                        "mission_name": scene_data.get("product", {}).get("result", {}).get("imagery", {}).get("missionname", "Unknown"),
-                        "coordinates": bounding_box  # List of (lon, lat) pairs
-                    })
-
-    return {"scenes": scenes_data}
+    try:
+        scenes, next_cursor = select_scenes(store)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    response = Response(to_stream(scene_table(scenes)), mimetype=ARROW_MIMETYPE)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
+
+def build_region_coverage(store, year):
+    regions = counties.coverage(store.index(), None if year == "all" else year)
+    return json_payload({"year": None if year == "all" else year, "regions": regions})
+
+region_coverage_cache = PayloadCache("region-coverage", build_region_coverage, cache)
+region_histogram_cache = PayloadCache(
+    "region-histogram", lambda store: json_payload({"regions": store.region_histogram()}), cache
+)
+
+@app.route("/regions/coverage", methods=["GET"])
+def get_region_coverage():
+    """Flask route to return covered area, scene and mission counts per region.
+
+    year limits the scenes to those dated in that year. Results are computed
+    once per scene store generation.
+    """
+    if counties is None:
+        return jsonify({"error": "Region boundaries are not available"}), 500
+
+    store = get_store()
+    if store is None:
+        return jsonify({"error": "Failed to fetch missions"}), 500
 
-@app.route("/scenes", methods=["GET"])
-def get_scenes_data():
-    """Flask route to return scene bounding boxes asynchronously."""
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    result = loop.run_until_complete(get_scenes_data_async())
-    return jsonify(result)
+    try:
+        year = int(request.args["year"]) if "year" in request.args else "all"
+    except ValueError:
+        return jsonify({"error": "year must be a number"}), 400
+
+    return payload_response(*region_coverage_cache.get(store, year))
+
+@app.route("/regions/histogram", methods=["GET"])
+def get_region_histograms():
+    """Flask route to return distinct missions per takeoff year for every region."""
+    store = get_store()
+    if store is None:
+        return jsonify({"error": "Failed to fetch missions"}), 500
+    return payload_response(*region_histogram_cache.get(store))
+
+@app.route("/regions/<name>/histogram", methods=["GET"])
+def get_region_histogram(name):
+    """Flask route to return distinct missions per takeoff year for one region."""
+    store = get_store()
+    if store is None:
+        return jsonify({"error": "Failed to fetch missions"}), 500
+
+    histogram = store.region_histogram(name)
+    if not histogram and (counties is None or name not in counties.names):
+        return jsonify({"error": "Region not found"}), 404
+    return jsonify({"region": name, "years": histogram})
 
 @app.route("/framesearch", methods=["GET"])
 def get_frame_search():
@@ -404,6 +381,10 @@ def get_frame_search():
 
         if response.status_code == 200:
             return jsonify(response.json())
+        elif response.status_code == 401:
+            # Cached token was revoked early; the next call fetches a new one
+            token_manager.invalidate(token)
+            return jsonify({"error": "Failed to authenticate"}), 500
         elif response.status_code == 404:
             return jsonify({"error": "Frame data not found"}), 404
         else:
@@ -412,59 +393,124 @@ def get_frame_search():
     except requests.exceptions.RequestException as e:
         return jsonify({"error": str(e)}), 500
 
+def clipped_scene_features(store):
+    """Land-clipped GeoJSON features keyed by scene id."""
+    scene_features = store.scene_features()
+    if not len(scene_features["scene_id"]):
+        return {}
+
+    scenes_gdf = gpd.GeoDataFrame(scene_features, geometry="geometry", crs="EPSG:4326")
+
+    # Clip to land
+    keep, clipped_geometries = land.clip(scenes_gdf.geometry.to_numpy())
+    clipped = gpd.GeoDataFrame(
+        scenes_gdf.drop(columns="geometry").iloc[keep],
+        geometry=clipped_geometries,
+        crs="EPSG:4326",
+    )
+
+    return {feature["properties"]["scene_id"]: feature for feature in clipped.__geo_interface__["features"]}
+
+def build_clipped_scenes(store, precision, delta):
+    """Serializes the FeatureCollection of every land-clipped scene."""
+    features = store.derived("clipped_features", clipped_scene_features)
+    return b"".join(iter_feature_collection(features.values(), precision, delta))
+
+clipped_scenes_cache = PayloadCache("clipped-scenes", build_clipped_scenes, cache)
+
 @app.route("/clipped-scenes", methods=["GET"])
 def get_clipped_scenes():
-    base_dir = os.path.abspath(os.path.dirname(__file__))
-    project_root = os.path.abspath(os.path.join(base_dir, "..", "..", ".."))
-    land_path = os.path.join(project_root, "frontend", "public", "assets", "gb_land.geojson.json")
+    """Serves the land-clipped scenes, recomputed only when the scene store changes.
 
+    Accepts the same bbox/start/end/mission/limit/cursor and precision/encoding
+    arguments as /scenes; without filters the cached full collection is served.
+    """
     try:
-        land = gpd.read_file(land_path)
-        land = land.to_crs("EPSG:4326")
-
-        global missions_Dictionary
-        # Use global data if available; otherwise, fetch it
-        if not missions_Dictionary:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            missions_dict = loop.run_until_complete(create_dictionary_async())
+        if land is None:
+            return jsonify({"error": "Land outline is not available"}), 500
+
+        store = get_store()
+        if store is None:
+            return jsonify({"error": "Failed to fetch missions"}), 500
+
+        scenes = members = None
+        try:
+            precision, delta = parse_coordinate_format(request.args)
+            if any(arg in request.args for arg in SCENE_QUERY_ARGS):
+                clipped = store.derived("clipped_features", clipped_scene_features)
+                # Scenes entirely offshore have no clipped feature, so pages skip them
+                scenes, next_cursor = select_scenes(store, keep=lambda scene_ids: np.fromiter(
+                    (scene_id in clipped for scene_id in scene_ids), bool, len(scene_ids)
+                ))
+                members = {"next_cursor": next_cursor}
+            elif (precision, delta) in CACHED_COORDINATE_FORMATS:
+                response = payload_response(*clipped_scenes_cache.get(store, precision, delta))
+                return coordinate_response(response, precision, delta)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        if scenes is None:
+            features = store.derived("clipped_features", clipped_scene_features).values()
         else:
-            missions_dict = missions_Dictionary
-
-        scene_features = []
-        for mission in missions_dict.values():
-            for scene_id, scene in mission.items():
-                if scene_id in ["aircraftTakeOffTime"]:
-                    continue
-
-                coords = scene["coordinates"]
-                if not coords or len(coords) < 3:
-                    continue  # Skip invalid geometries
-
-                try:
-                    polygon = Polygon(coords)
-                    if not polygon.is_valid:
-                        polygon = polygon.buffer(0)
-
-                    scene_features.append({
-                        "scene_id": scene["scene_id"],
-                        "mission_name": scene["mission_name"],
-                        "objectstartdate": scene["objectstartdate"],
-                        "aircrafttakeofftime": scene["aircraftTakeOffTime"],
-                        "geometry": polygon
-                    })
-                except Exception as e:
-                    print("⚠️ Skipping invalid scene:", scene.get("scene_id"), e)
-
-        if not scene_features:
-            return jsonify({"features": []})
-
-        scenes_gdf = gpd.GeoDataFrame(scene_features, geometry="geometry", crs="EPSG:4326")
-
-        # Clip to land
-        clipped = gpd.overlay(scenes_gdf, land, how="intersection")
-
-        return jsonify(clipped.__geo_interface__)
+            features = (clipped[scene_id] for scene_id in scenes.scene_ids if scene_id in clipped)
+        chunks = iter_feature_collection(features, precision, delta, members)
+        return coordinate_response(Response(chunks, mimetype="application/json"), precision, delta)
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def build_scene_tiles(store):
+    tiles = SceneTiles(store.token, store.derived("clipped_features", clipped_scene_features).values())
+    remove_stale_tiles(store.token)
+    return tiles
+
+# Arguments that narrow which scenes are drawn on a tile
+TILE_QUERY_ARGS = ("start", "end", "mission")
+
+@app.route("/tiles/scenes/<int:z>/<int:x>/<int:y>.mvt", methods=["GET"])
+def get_scene_tile(z, x, y):
+    """Serves one Mapbox Vector Tile of the land-clipped scenes.
+
+    Accepts the start/end/mission filters of /scenes. Tiles are rendered on
+    demand and cached until the scene store changes.
+    """
+    try:
+        if not is_valid_tile(z, x, y):
+            return jsonify({"error": "Tile is out of range"}), 404
+        if land is None:
+            return jsonify({"error": "Land outline is not available"}), 500
+
+        store = get_store()
+        if store is None:
+            return jsonify({"error": "Failed to fetch missions"}), 500
+
+        key = select = None
+        args = request.args
+        if any(arg in args for arg in TILE_QUERY_ARGS):
+            query = {}
+            try:
+                if "start" in args:
+                    query["start"] = parse_date(args["start"])
+                if "end" in args:
+                    query["end"] = parse_date(args["end"], end_of_period=True)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            if "mission" in args:
+                query["mission"] = args["mission"]
+
+            # Cached tiles are keyed on the parsed filters; the scene query only runs on a miss
+            key = tuple(query.get(arg) for arg in TILE_QUERY_ARGS)
+
+            def select():
+                index = store.index()
+                return frozenset(index.columns.scene_ids[index.query(**query)])
+
+        tiles = store.derived("scene_tiles", build_scene_tiles)
+        body = tiles.tile(z, x, y, key, select)
+
+        response = Response(body, mimetype="application/vnd.mapbox-vector-tile")
+        response.add_etag()
+        return response.make_conditional(request)
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
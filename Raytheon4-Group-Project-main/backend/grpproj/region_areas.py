@@ -0,0 +1,123 @@
+"""
+Offline builder for the area of every region in the counties GeoJSON.
+
+Run from backend/grpproj:
+
+    python region_areas.py [input] [--output path] [--workers n]
+
+Areas are geodesic km² stored in each feature's "area" property. The output
+is written compactly and atomically, and a sidecar file records content
+hashes so rerunning on unchanged input does nothing.
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from shapely.geometry import shape
+
+# geometry.py is loaded on its own: importing it through the grpproj package
+# would start the Flask app, and again in every spawned pool worker
+GEOMETRY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "grpproj", "geometry.py")
+_spec = importlib.util.spec_from_file_location("geometry", GEOMETRY_PATH)
+_geometry = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_geometry)
+calculate_areas, make_valid = _geometry.calculate_areas, _geometry.make_valid
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+# Same defaults as grpproj/regions.py
+COUNTIES_PATH = os.environ.get(
+    "COUNTIES_PATH", os.path.join(project_root, "frontend", "public", "assets", "uk-counties.geojson")
+)
+COUNTY_NAME_FIELD = os.environ.get("COUNTY_NAME_FIELD", "ctyua_name")
+
+# Geometries per task sent to the process pool
+CHUNK_SIZE = 64
+
+def file_hash(path):
+    with open(path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+def hash_path(output_path):
+    return f"{output_path}.sha256.json"
+
+def is_up_to_date(input_path, output_path):
+    """Whether output_path was built from input_path as it is now.
+
+    Also true when input_path is itself the output of the last run, so an
+    in-place build is a no-op the second time.
+    """
+    try:
+        with open(hash_path(output_path)) as file:
+            recorded = json.load(file)
+        input_hash = file_hash(input_path)
+        return file_hash(output_path) == recorded["output"] and input_hash in (recorded["input"], recorded["output"])
+    except (OSError, ValueError, KeyError):
+        return False
+
+def chunk_areas(geometries):
+    return calculate_areas(make_valid(np.array(geometries, dtype=object)))
+
+def region_areas(geometries, workers=None):
+    """Geodesic areas of (Multi)Polygons, with chunks measured in parallel."""
+    chunks = [geometries[i:i + CHUNK_SIZE] for i in range(0, len(geometries), CHUNK_SIZE)]
+    if len(chunks) <= 1 or workers == 1:
+        return chunk_areas(geometries)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return np.concatenate(list(pool.map(chunk_areas, chunks)))
+
+def write_atomic(path, data):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(data)
+    os.replace(tmp_path, path)
+
+def build(input_path, output_path, workers=None, force=False):
+    """Writes input_path with every region's area to output_path. Returns False if it was up to date."""
+    if not force and is_up_to_date(input_path, output_path):
+        return False
+
+    with open(input_path, "rb") as file:
+        input_data = file.read()
+    regions = json.loads(input_data)
+
+    features = []
+    geometries = []
+    for feature in regions["features"]:
+        geometry = feature.get("geometry") or {}
+        if geometry.get("type") not in ("Polygon", "MultiPolygon") or not geometry.get("coordinates"):
+            name = (feature.get("properties") or {}).get(COUNTY_NAME_FIELD, "Unknown")
+            print(f"⚠️ Skipping region without a polygon geometry: {name}")
+            continue
+        features.append(feature)
+        geometries.append(shape(geometry))
+
+    for feature, area in zip(features, region_areas(geometries, workers)):
+        feature.setdefault("properties", {})["area"] = float(area)
+
+    output_data = json.dumps(regions, separators=(",", ":")).encode()
+    write_atomic(output_path, output_data)
+    write_atomic(hash_path(output_path), json.dumps({
+        "input": hashlib.sha256(input_data).hexdigest(),
+        "output": hashlib.sha256(output_data).hexdigest(),
+    }).encode())
+    print(f"Wrote areas of {len(features)} regions to {output_path}")
+    return True
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute the area of every region in a GeoJSON file.")
+    parser.add_argument("input", nargs="?", default=COUNTIES_PATH, help="counties GeoJSON (default: %(default)s)")
+    parser.add_argument("--output", help="where to write the result (default: overwrite input)")
+    parser.add_argument("--workers", type=int, help="processes to use (default: one per CPU)")
+    parser.add_argument("--force", action="store_true", help="rebuild even if the input is unchanged")
+    args = parser.parse_args(argv)
+
+    if not build(args.input, args.output or args.input, args.workers, args.force):
+        print(f"{args.output or args.input} is up to date")
+
+if __name__ == "__main__":
+    main()